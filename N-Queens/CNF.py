@@ -1,15 +1,74 @@
-from pysat.solvers import Glucose3 
+import time
+from threading import Timer
+
+from pysat.solvers import Solver
 
 class CNF:
-    def __init__(self):
-        self.solver = Glucose3()
+    # propagations per slice of a search with a timeout
+    SLICE = 10000
+
+    # solver: PySAT solver name; Glucose3 ("g3") is the default. Minisat22
+    # ("m22") checks its budget everywhere, so it keeps timeouts tight, but it
+    # solves large placement queries more slowly
+    def __init__(self, solver="g3"):
+        self.solver = Solver(name=solver)
+        self.clauses = 0
+        self.literals = 0
 
+    # clauses may be any iterable (e.g. Problem.get_clauses()), each clause is
+    # passed to the solver as soon as it is generated
     def add_clauses(self, clauses):
         for clause in clauses:
             self.solver.add_clause(clause)
+            self.clauses += 1
+            self.literals += len(clause)
     
     def get_solution(self):
         self.solver.solve()
         return self.solver.get_model()
-    
-    
+
+    # Solve under assumptions (literals that hold for this call only, the
+    # formula is unchanged). Returns True or False, or None when timeout
+    # seconds pass first. The search runs in slices of SLICE propagations and
+    # the deadline is checked between slices, with an interrupt as a backstop.
+    # The timeout is best-effort: Glucose does not check budgets or interrupts
+    # in every phase of its search, so a slice can overrun it (by up to seconds
+    # on N >= 60 boards); Minisat22 stays within about a millisecond
+    def solve(self, assumptions=[], timeout=None):
+        if timeout is None:
+            return self.solver.solve(assumptions=assumptions)
+        deadline = time.monotonic() + timeout
+        timer = Timer(timeout, self.solver.interrupt)
+        timer.start()
+        try:
+            while time.monotonic() < deadline:
+                self.solver.prop_budget(self.SLICE)
+                satisfiable = self.solver.solve_limited(assumptions=assumptions, expect_interrupt=True)
+                if satisfiable is not None:
+                    return satisfiable
+            return None
+        finally:
+            timer.cancel()
+            self.solver.clear_interrupt()
+
+    # Enumerate models on this solver: after each model a blocking clause over
+    # its true literals among variables rules it out, so every model yielded has
+    # a different set of true variables. Stops after limit models or timeout
+    # seconds; self.complete is True only if every model was found
+    def iter_models(self, variables, limit=None, timeout=None):
+        self.complete = False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        found = 0
+        while limit is None or found < limit:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            satisfiable = self.solve(timeout=remaining)
+            if satisfiable is None:
+                return
+            if not satisfiable:
+                self.complete = True
+                return
+            model = self.solver.get_model()
+            true = [lit for lit in (model[v - 1] for v in variables) if lit > 0]
+            self.solver.add_clause([-lit for lit in true])
+            found += 1
+            yield model
@@ -0,0 +1,66 @@
+# At-most-one encodings. Each one yields the clauses saying that at most one of
+# lits is true, taking fresh auxiliary variables from pool (pysat IDPool).
+
+
+def pairwise(lits, pool):
+    # no auxiliary variables, n(n-1)/2 binary clauses
+    for a in range(len(lits)):
+        for b in range(a + 1, len(lits)):
+            yield [-lits[a], -lits[b]]
+
+
+def sequential(lits, pool):
+    # Sinz sequential counter: s[i] means one of lits[0..i] is true,
+    # n-1 auxiliary variables, 3n-4 clauses
+    n = len(lits)
+    if n < 2:
+        return
+    s = [pool.id() for _ in range(n - 1)]
+    yield [-lits[0], s[0]]
+    for i in range(1, n - 1):
+        yield [-lits[i], s[i]]
+        yield [-s[i - 1], s[i]]
+        yield [-lits[i], -s[i - 1]]
+    yield [-lits[n - 1], -s[n - 2]]
+
+
+def commander(lits, pool, group=3):
+    # Klieber-Kwon commander encoding: pairwise inside groups of size group,
+    # each group gets a commander variable implied by its members, then at most
+    # one commander recursively
+    if len(lits) <= group + 1:
+        yield from pairwise(lits, pool)
+        return
+    commanders = []
+    for start in range(0, len(lits), group):
+        members = lits[start : start + group]
+        c = pool.id()
+        commanders.append(c)
+        yield from pairwise(members, pool)
+        for lit in members:
+            yield [-lit, c]
+    yield from commander(commanders, pool, group)
+
+
+def ladder(lits, pool):
+    # ladder (order) encoding: y[i] means the true literal comes after lits[i],
+    # y[i] -> y[i-1], lits[i] -> not y[i] and lits[i] -> y[i-1]
+    n = len(lits)
+    if n < 2:
+        return
+    y = [pool.id() for _ in range(n - 1)]
+    for i in range(1, n - 1):
+        yield [-y[i], y[i - 1]]
+    for i in range(n):
+        if i < n - 1:
+            yield [-lits[i], -y[i]]
+        if i > 0:
+            yield [-lits[i], y[i - 1]]
+
+
+ENCODINGS = {
+    "pairwise": pairwise,
+    "sequential": sequential,
+    "commander": commander,
+    "ladder": ladder,
+}
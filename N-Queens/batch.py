@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from amo import ENCODINGS
+from CNF import CNF
+from problem import Problem
+
+
+# "8", "8-12" or "8-64:8" (first-last:step), separated by commas
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        step = 1
+        if ":" in part:
+            part, step = part.split(":")
+        first, _, last = part.partition("-")
+        sizes.extend(range(int(first), int(last or first) + 1, int(step)))
+    return sizes
+
+
+# Solve one instance in a worker with its own solver. Pre-placed queens are
+# passed as assumptions. A bad task gives an ERROR record instead of stopping
+# the batch
+def solve_instance(task):
+    if not isinstance(task, dict):
+        return dict(status="ERROR", error=f"task must be a JSON object: {task!r}")
+    result = dict(
+        N=task.get("N"),
+        queens=task.get("queens", []),
+        encoding=task.get("encoding", "pairwise"),
+    )
+    try:
+        return dict(result, **solve_task(task))
+    except Exception as error:
+        return dict(result, status="ERROR", error=f"{type(error).__name__}: {error}")
+
+
+def solve_task(task):
+    N = task["N"]
+    if not isinstance(N, int) or N < 1:
+        raise ValueError(f"bad board size {N!r}")
+    placed = [tuple(queen) for queen in task.get("queens", [])]
+    if any(not (0 <= i < N and 0 <= j < N) for i, j in placed):
+        raise ValueError("queen outside the board")
+
+    start = time.perf_counter()
+    p = Problem(N, task.get("encoding", "pairwise"))
+    cnf = CNF()
+    cnf.add_clauses(p.get_clauses())
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    satisfiable = cnf.solve([i * N + j + 1 for i, j in placed], task.get("timeout"))
+    solve = time.perf_counter() - start
+
+    status = {True: "SAT", False: "UNSAT", None: "TIMEOUT"}[satisfiable]
+    solution = None
+    if satisfiable:
+        model = cnf.solver.get_model()
+        solution = [divmod(v - 1, N) for v in model[: N * N] if v > 0]
+    cnf.solver.delete()
+    return dict(
+        queens=placed,
+        status=status,
+        variables=p.pool.top,
+        clauses=cnf.clauses,
+        build_s=build,
+        solve_s=solve,
+        solution=solution,
+    )
+
+
+# Solve every task on a process pool, yielding results as they finish
+def solve_batch(tasks, workers=None):
+    if workers == 1:
+        for task in tasks:
+            yield solve_instance(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_instance, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve N-Queens for many board sizes")
+    parser.add_argument("--sizes", help='board sizes, e.g. "8,10,16-64:8"')
+    parser.add_argument("--input", help="JSONL file of tasks {N, queens, encoding, timeout}")
+    parser.add_argument("--queens", default="[]", help="JSON list of [row, col] placed on every board")
+    parser.add_argument("--encoding", choices=list(ENCODINGS), default="pairwise")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per instance")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="-")
+    args = parser.parse_args()
+
+    defaults = dict(encoding=args.encoding, timeout=args.timeout)
+    tasks = []
+    if args.sizes:
+        queens = json.loads(args.queens)
+        tasks += [dict(defaults, N=N, queens=queens) for N in parse_sizes(args.sizes)]
+    if args.input:
+        with open(args.input) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    task = json.loads(line)
+                except ValueError as error:
+                    parser.error(f"{args.input}:{number}: {error}")
+                tasks.append(dict(defaults, **task) if isinstance(task, dict) else task)
+    if not tasks:
+        parser.error("no instances: use --sizes or --input")
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    start = time.perf_counter()
+    counts = {}
+    try:
+        for result in solve_batch(tasks, args.workers):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(dict(instances=len(tasks), elapsed_s=time.perf_counter() - start, **counts)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
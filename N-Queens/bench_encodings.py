@@ -0,0 +1,65 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+from amo import ENCODINGS
+from CNF import CNF
+from problem import Problem
+
+
+# Stream one model into the solver and solve it, returning its size and timings
+def bench(N, encoding):
+    p = Problem(N, encoding)
+    cnf = CNF()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cnf.add_clauses(p.get_clauses())
+    load = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    solution = cnf.get_solution()
+    solve = time.perf_counter() - start
+
+    return dict(
+        N=N,
+        encoding=encoding,
+        variables=p.pool.top,
+        clauses=cnf.clauses,
+        literals=cnf.literals,
+        peak_mb=peak / 2**20,
+        load_s=load,
+        solve_s=solve,
+        total_s=load + solve,
+        solved=solution is not None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare at-most-one encodings")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 64, 128])
+    parser.add_argument(
+        "--encodings", nargs="+", choices=list(ENCODINGS), default=list(ENCODINGS)
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args()
+
+    header = "%6s %-11s %9s %10s %10s %8s %8s %8s %8s"
+    if not args.json:
+        print(header % ("N", "encoding", "vars", "clauses", "literals", "peak MB",
+                        "load s", "solve s", "total s"))
+    for N in args.sizes:
+        for encoding in args.encodings:
+            result = bench(N, encoding)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print("%6d %-11s %9d %10d %10d %8.1f %8.3f %8.3f %8.3f" % (
+                    N, encoding, result["variables"], result["clauses"],
+                    result["literals"], result["peak_mb"], result["load_s"],
+                    result["solve_s"], result["total_s"]))
+
+
+if __name__ == "__main__":
+    main()
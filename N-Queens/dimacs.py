@@ -0,0 +1,37 @@
+import argparse
+
+from amo import ENCODINGS
+from problem import Problem
+
+# room for "p cnf <vars> <clauses>", rewritten once the counts are known
+HEADER = 40
+
+
+# Write clauses to a DIMACS file as they are generated. The header is written
+# last (over a blank placeholder line) so the formula is never held in memory.
+def write_dimacs(clauses, path):
+    variables = count = 0
+    with open(path, "w") as f:
+        f.write(" " * HEADER + "\n")
+        for clause in clauses:
+            f.write(" ".join(map(str, clause)) + " 0\n")
+            count += 1
+            variables = max(variables, max(abs(lit) for lit in clause))
+        f.seek(0)
+        f.write(f"p cnf {variables} {count}".ljust(HEADER))
+    return variables, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the N-Queens formula as DIMACS")
+    parser.add_argument("N", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--encoding", choices=list(ENCODINGS), default="pairwise")
+    args = parser.parse_args()
+
+    variables, count = write_dimacs(Problem(args.N, args.encoding).get_clauses(), args.path)
+    print(f"{args.path}: {variables} variables, {count} clauses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import sys
+import time
+
+from amo import ENCODINGS
+from CNF import CNF
+from problem import Problem
+
+
+# Answers "complete this partial placement" queries for one board size. The
+# formula is encoded into a single solver once; each query only passes its
+# queens as assumptions, so nothing is re-encoded between queries
+# solver: PySAT solver name (see CNF). Minisat22 is the default here because
+# it honours the per-query timeout to within about a millisecond; Glucose3
+# ("g3") completes more large placements but can overrun a timeout by seconds
+class PlacementSolver:
+    def __init__(self, side, encoding="pairwise", solver="m22"):
+        self.side = side
+        self.problem = Problem(side, encoding)
+        self.cnf = CNF(solver)
+        self.cnf.add_clauses(self.problem.get_clauses())
+
+    def literal(self, queen):
+        i, j = queen
+        if not (0 <= i < self.side and 0 <= j < self.side):
+            raise ValueError(f"queen {queen} is outside the board")
+        return i * self.side + j + 1
+
+    def queen(self, literal):
+        return divmod(abs(literal) - 1, self.side)
+
+    # Returns dict(status, solution, core, minimal, time_s). status is "SAT"
+    # (solution lists every queen), "UNSAT" (core is a subset of the given queens
+    # that cannot be completed together) or "TIMEOUT". minimize shrinks the core
+    # until dropping any queen makes it completable; timeout covers the whole
+    # query (best-effort, see CNF.solve), so minimal is False if the time ran
+    # out before the core was minimal
+    def complete(self, queens, timeout=None, minimize=False):
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        assumptions = [self.literal(queen) for queen in queens]
+        satisfiable = self.cnf.solve(assumptions, timeout)
+        solution = core = minimal = None
+        if satisfiable:
+            model = self.cnf.solver.get_model()
+            solution = [self.queen(v) for v in model[: self.side ** 2] if v > 0]
+        elif satisfiable is False:
+            core = sorted(set(self.cnf.solver.get_core() or []))
+            if minimize:
+                core, minimal = self.minimize(core, deadline)
+            core = [self.queen(v) for v in core]
+        return dict(
+            status={True: "SAT", False: "UNSAT", None: "TIMEOUT"}[satisfiable],
+            solution=solution,
+            core=core,
+            minimal=minimal,
+            time_s=time.perf_counter() - start,
+        )
+
+    # deletion-based core minimization: drop each queen in turn and keep it
+    # dropped if the rest still cannot be completed. Every check gets only the
+    # time left before deadline (time.monotonic()); returns (core, minimal)
+    def minimize(self, core, deadline=None):
+        core = list(core)
+        for literal in list(core):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            rest = [other for other in core if other != literal]
+            satisfiable = self.cnf.solve(rest, remaining)
+            if satisfiable is None:
+                return core, False
+            if satisfiable is False:
+                core = rest
+        return core, True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer partial placement queries read as JSON lines from stdin"
+    )
+    parser.add_argument("N", type=int)
+    parser.add_argument("--encoding", choices=list(ENCODINGS), default="pairwise")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds per query (best-effort with g3, see --solver)")
+    parser.add_argument("--solver", default="m22",
+                        help="PySAT solver name; g3 (Glucose3) may overrun --timeout")
+    parser.add_argument("--minimize", action="store_true", help="minimize conflict cores")
+    args = parser.parse_args()
+
+    solver = PlacementSolver(args.N, args.encoding, args.solver)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            query = json.loads(line)
+            if isinstance(query, list):
+                query = dict(queens=query)
+            if not isinstance(query, dict):
+                raise ValueError("query must be a list of queens or an object")
+            result = solver.complete(
+                query.get("queens", []),
+                query.get("timeout", args.timeout),
+                query.get("minimize", args.minimize),
+            )
+        except (ValueError, TypeError) as error:
+            result = dict(status="ERROR", error=str(error))
+        print(json.dumps(result), flush=True)
+
+if __name__ == "__main__":
+    main()
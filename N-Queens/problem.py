@@ -1,36 +1,97 @@
+from pysat.formula import IDPool
+
+from amo import ENCODINGS
+
+
 class Problem:
-    def __init__(self, side=4):
+    # encoding: name of the at-most-one encoding (see amo.ENCODINGS) or a
+    # dict choosing one per constraint, e.g. {"row": "ladder", "diag": "pairwise"}
+    # symmetry_breaking: add lex-leader clauses so that only one solution of each
+    # class of rotations/reflections satisfies the formula
+    def __init__(self, side=4, encoding="pairwise", symmetry_breaking=False):
         self.side = side
         self.is_possible_solution = False
-        self.clauses = self.create_clauses()
+        self.encoding = self.choose_encoding(encoding)
+        self.symmetry_breaking = symmetry_breaking
+        self.pool = IDPool(start_from=side * side + 1)
         self.board = [[ False for _ in range(side)] for _ in range(side)]
 
+    def choose_encoding(self, encoding):
+        if isinstance(encoding, str):
+            encoding = {"row": encoding, "col": encoding, "diag": encoding}
+        return {
+            constraint: ENCODINGS[encoding.get(constraint, "pairwise")]
+            for constraint in ("row", "col", "diag")
+        }
+
+    # clauses are generated lazily, one at a time, so the whole formula is never
+    # held in memory; every call starts a new stream with fresh auxiliary variables
     def get_clauses(self):
-        return self.clauses
-    
+        self.pool = IDPool(start_from=self.side * self.side + 1)
+        return self.create_clauses()
+
+    def diagonals(self):
+        N = self.side
+        for d in range(-N + 2, N - 1):
+            yield [i * N + i + d + 1 for i in range(N) if 0 <= i + d < N]
+            yield [i * N + (N - 1 - i - d) + 1 for i in range(N) if 0 <= N - 1 - i - d < N]
+
     def create_clauses(self):
         N = self.side
-        clauses = []
 
         for i in range(N):
             row_clause = [(i * N + j + 1) for j in range(N)]
-            clauses.append(row_clause)  # one row has at least one Queen
+            yield row_clause  # one row has at least one Queen
+            yield from self.encoding["row"](row_clause, self.pool)  # one row has at most one Queen
 
             col_clause = [(j * N + i + 1) for j in range(N)]
-            clauses.append(col_clause)  # one column has at least one Queen
+            yield col_clause  # one column has at least one Queen
+            yield from self.encoding["col"](col_clause, self.pool)  # one column has at most one Queen
 
-            for j1 in range(N):
-                for j2 in range(j1 + 1, N):
-                    clauses.append([-row_clause[j1], -row_clause[j2]])  # one row has at most one Queen
-                    clauses.append([-col_clause[j1], -col_clause[j2]])  # one column has at most one Queen
+        for diagonal in self.diagonals():
+            yield from self.encoding["diag"](diagonal, self.pool)  # one diagonal has at most one Queen
 
-                for k in range(i + 1, N):
-                    d = k - i
-                    if j1 - d >= 0:
-                        clauses.append([-(i * N + j1 + 1), -(k * N + j1 - d + 1)])
-                    if j1 + d < N:
-                        clauses.append([-(i * N + j1 + 1), -(k * N + j1 + d + 1)])
-        return clauses
+        if self.symmetry_breaking:
+            yield from self.lex_leader_clauses()
+
+    # cell (i, j) moved by symmetry t: t % 4 quarter turns, transposed first if t >= 4
+    def transform(self, i, j, t):
+        if t >= 4:
+            i, j = j, i
+        for _ in range(t % 4):
+            i, j = j, self.side - 1 - i
+        return i, j
+
+    # the queen variables of the board moved by symmetry t
+    def symmetric_variables(self, t):
+        N = self.side
+        variables = [0] * (N * N)
+        for i in range(N):
+            for j in range(N):
+                x, y = self.transform(i, j, t)
+                variables[x * N + y] = i * N + j + 1
+        return variables
+
+    # X <=lex sigma(X) for the 7 non-identity symmetries sigma, over the queen
+    # variables in index order. e[k] is forced true while the first k+1 positions
+    # of X and sigma(X) are equal; at the first difference X must not be larger
+    def lex_leader_clauses(self):
+        cells = self.side * self.side
+        for t in range(1, 8):
+            image = self.symmetric_variables(t)
+            equal = None
+            for k in range(cells):
+                x, y = k + 1, image[k]
+                if x == y:
+                    continue
+                prefix = [] if equal is None else [-equal]
+                yield prefix + [-x, y]
+                if k == cells - 1:
+                    break
+                following = self.pool.id()
+                yield prefix + [-x, -y, following]
+                yield prefix + [x, y, following]
+                equal = following
 
     def add_solution(self, solution):
         if solution != None:
@@ -40,7 +101,7 @@ class Problem:
                 for j in range(self.side):
                     if solution[i*self.side + j] > 0:
                         self.board[i][j] = True
-    
+
     def draw_board(self):
         if self.is_possible_solution == False:
             print('No possible solution.')
@@ -52,4 +113,4 @@ class Problem:
                     else:
                         print('.', end=' ')
                 print()
-            print()
\ No newline at end of file
+            print()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import time
+
+from amo import ENCODINGS
+from CNF import CNF
+from problem import Problem
+
+
+# queens (row, column) of a model
+def queens(model, N):
+    return [divmod(v - 1, N) for v in model[: N * N] if v > 0]
+
+
+# number of distinct boards among the 8 symmetric images of a solution
+def orbit_size(p, placed):
+    return len({frozenset(p.transform(i, j, t) for i, j in placed) for t in range(8)})
+
+
+# Stream the solutions of one N on a single incremental solver. With unique=True
+# only one solution per symmetry class is produced (lex-leader clauses)
+def iter_solutions(N, encoding="pairwise", unique=False, limit=None, timeout=None):
+    p = Problem(N, encoding, symmetry_breaking=unique)
+    cnf = CNF()
+    cnf.add_clauses(p.get_clauses())
+    for model in cnf.iter_models(range(1, N * N + 1), limit, timeout):
+        yield queens(model, N)
+
+
+# count the solutions of N; with unique=True also the number of symmetry classes
+def count_solutions(N, encoding="pairwise", unique=False, limit=None, timeout=None):
+    p = Problem(N, encoding, symmetry_breaking=unique)
+    cnf = CNF()
+    start = time.perf_counter()
+    cnf.add_clauses(p.get_clauses())
+    solutions = classes = 0
+    for model in cnf.iter_models(range(1, N * N + 1), limit, timeout):
+        classes += 1
+        solutions += orbit_size(p, queens(model, N)) if unique else 1
+    return dict(
+        N=N,
+        solutions=solutions,
+        classes=classes if unique else None,
+        complete=cnf.complete,
+        time_s=time.perf_counter() - start,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count or list N-Queens solutions")
+    parser.add_argument("sizes", type=int, nargs="+", help="N, or first and last N")
+    parser.add_argument("--unique", action="store_true", help="one solution per symmetry class")
+    parser.add_argument("--list", action="store_true", help="print every solution")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per N")
+    parser.add_argument("--encoding", choices=list(ENCODINGS), default="pairwise")
+    args = parser.parse_args()
+
+    first, last = args.sizes[0], args.sizes[-1]
+    for N in range(first, last + 1):
+        if args.list:
+            for placed in iter_solutions(N, args.encoding, args.unique, args.limit, args.timeout):
+                print(json.dumps(dict(N=N, queens=placed)))
+        else:
+            print(json.dumps(count_solutions(N, args.encoding, args.unique, args.limit, args.timeout)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Mã hóa ô cờ dạng số nguyên cho các mảng (n, size, size)
+EMPTY, X, O = 0, 1, 2
+CODES = {"X": X, "O": O}
+
+# Chữ số cơ số 3 của từng ký tự pattern
+DIGITS = {"e": 0, "x": 1, "b": 2}
+
+
+def encode(board, empty="·"):
+    """
+    Chuyển mảng ký tự của Board thành mảng số nguyên (EMPTY, X, O)
+    """
+    encoded = np.full(board.shape, EMPTY, dtype=np.int8)
+    encoded[board == "X"] = X
+    encoded[board == "O"] = O
+    return encoded
+
+
+def windows(digits, flipped, span, t):
+    """
+    Ô thứ t của mọi cửa sổ (span vị trí bắt đầu mỗi chiều) theo 4 hướng:
+    dòng, cột, đường chéo chính, đường chéo phụ (đường chéo của bàn lật ngang)
+    """
+    return (
+        digits[:, :, t : t + span],
+        digits[:, t : t + span, :],
+        digits[:, t : t + span, t : t + span],
+        flipped[:, t : t + span, t : t + span],
+    )
+
+
+class BatchEvaluator:
+    """
+    Đánh giá nhiều bàn cờ cùng lúc bằng NumPy.
+    Mỗi cửa sổ độ dài L trên một hướng được mã hóa thành số cơ số 3 bằng
+    phép cộng dịch chuyển (tích chập với 1, 3, 9, ...), rồi tra bảng trọng số
+    dựng sẵn từ UTILITY. Kết quả trùng với Problem.calculate_heuristic.
+    """
+
+    def __init__(self, utility, heuristic, opponent_factor):
+        """
+        utility: bảng pattern UTILITY
+        heuristic: mảng giá trị vị trí (Problem.HEURISTIC)
+        opponent_factor: hệ số điểm của đối thủ
+        """
+        self.heuristic = np.asarray(heuristic, dtype=np.int64)
+        self.opponent_factor = opponent_factor
+        self.tables = {}
+        for value, patterns in utility.values():
+            for pattern in patterns:
+                length = len(pattern)
+                table = self.tables.setdefault(
+                    length, np.zeros(3**length, dtype=np.int64)
+                )
+                code = sum(DIGITS[c] * 3**t for t, c in enumerate(pattern))
+                table[code] += value
+
+    def sequence_scores(self, boards, player):
+        """
+        Điểm pattern của player (mã X hoặc O) trên từng bàn cờ
+        """
+        opponent = O if player == X else X
+        digits = np.zeros(boards.shape, dtype=np.int64)
+        digits[boards == player] = DIGITS["x"]
+        digits[boards == opponent] = DIGITS["b"]
+        size = boards.shape[1]
+        flipped = digits[:, :, ::-1]
+
+        scores = np.zeros(boards.shape[0], dtype=np.int64)
+        for length, table in self.tables.items():
+            if length > size:
+                continue
+            span = size - length + 1
+            codes = [w.copy() for w in windows(digits, flipped, span, 0)]
+            for t in range(1, length):
+                for code, window in zip(codes, windows(digits, flipped, span, t)):
+                    code += window * 3**t
+            for code in codes:
+                scores += table[code].reshape(len(scores), -1).sum(axis=1)
+        return scores
+
+    def position_scores(self, boards, player):
+        """
+        Điểm vị trí của player trên từng bàn cờ
+        """
+        return ((boards == player) * self.heuristic).sum(axis=(1, 2))
+
+    def evaluate(self, boards, player):
+        """
+        Giá trị heuristic của từng bàn cờ theo góc nhìn của player ("X"/"O")
+        boards: mảng số nguyên (n, size, size) hoặc (size, size)
+        """
+        boards = np.asarray(boards)
+        if boards.ndim == 2:
+            boards = boards[np.newaxis]
+        player = CODES.get(player, player)
+        opponent = O if player == X else X
+        player_score = self.sequence_scores(boards, player) + self.position_scores(
+            boards, player
+        )
+        opponent_score = self.sequence_scores(boards, opponent) + self.position_scores(
+            boards, opponent
+        )
+        return player_score - self.opponent_factor * opponent_score
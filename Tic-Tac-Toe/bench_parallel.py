@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+
+from bitboard import BitBoard
+from ordering import MoveOrdering
+from problem import Problem
+from search import SearchStrategy
+
+
+def random_position(rng, size, stones):
+    """
+    Tạo thế cờ ngẫu nhiên gồm stones quân quanh trung tâm, chưa kết thúc
+    """
+    while True:
+        problem = Problem(size, board_class=BitBoard)
+        player = problem.ai_player
+        low, high = size // 4, size - size // 4
+        cells = [(x, y) for x in range(low, high) for y in range(low, high)]
+        for x, y in rng.sample(cells, stones):
+            problem.board.make_move(x, y, player)
+            player = (
+                problem.human_player
+                if player == problem.ai_player
+                else problem.ai_player
+            )
+        if not problem.is_game_over():
+            return problem
+
+
+def main():
+    """
+    So sánh thời gian tìm kiếm tuần tự và song song ở gốc trên các thế cờ
+    ngẫu nhiên, đồng thời kiểm tra hai cách cho cùng nước đi
+    """
+    parser = argparse.ArgumentParser(description="Parallel root search benchmark")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--stones", type=int, default=6)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    positions = [
+        random_position(rng, args.size, args.stones) for _ in range(args.positions)
+    ]
+
+    def run(strategy):
+        moves = []
+        start = time.perf_counter()
+        for problem in positions:
+            moves.append(strategy.alpha_beta_search(problem))
+        return moves, time.perf_counter() - start
+
+    serial_moves, serial_time = run(SearchStrategy(args.depth, ordering=MoveOrdering()))
+    print(f"workers=1 time={serial_time:.3f}s")
+    for workers in args.workers:
+        strategy = SearchStrategy(args.depth, ordering=MoveOrdering(), workers=workers)
+        # Lần chạy đầu để khởi động pool, không tính thời gian
+        run(strategy)
+        moves, elapsed = run(strategy)
+        strategy.close()
+        print(
+            f"workers={workers} time={elapsed:.3f}s "
+            f"speedup={serial_time / elapsed:.2f}x "
+            f"same_moves={moves == serial_moves}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from bitboard import BitBoard
+from problem import Problem
+from search import SearchStrategy
+
+POSITIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "positions.json")
+
+
+def load_positions(path=POSITIONS):
+    """
+    Đọc bộ thế cờ mẫu: mỗi thế cờ gồm tên, kích thước, quân của người chơi
+    và danh sách nước đi (x, y, player) theo thứ tự (tùy chọn win_length,
+    mặc định 4)
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_problem(position):
+    """
+    Tạo Problem ứng với một thế cờ mẫu (AI là bên đến lượt đi)
+    """
+    problem = Problem(
+        position["size"],
+        human_player=position["human_player"],
+        win_length=position.get("win_length", 4),
+        board_class=BitBoard,
+    )
+    problem.load_moves([tuple(move) for move in position["moves"]])
+    return problem
+
+
+def time_per_call(func, repeat=5, min_time=0.05):
+    """
+    Thời gian trung bình mỗi lần gọi func (giây), lấy lần đo nhanh nhất
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def bench_position(position, depths, repeat, search_repeat):
+    """
+    Đo một thế cờ: đánh giá (cập nhật dần và tính lại toàn bộ), kiểm tra kết
+    thúc game và tìm kiếm ở các độ sâu cố định
+    """
+    problem = build_problem(position)
+    board = problem.board.board
+    result = dict(
+        evaluate_us=time_per_call(problem.evaluate, repeat) * 1e6,
+        full_evaluate_us=time_per_call(
+            lambda: problem.calculate_heuristic(board, problem.ai_player), repeat
+        )
+        * 1e6,
+        game_over_us=time_per_call(problem.is_game_over, repeat) * 1e6,
+    )
+    for depth in depths:
+        best = float("inf")
+        for _ in range(search_repeat):
+            strategy = SearchStrategy(depth)
+            start = time.perf_counter()
+            move, stats = strategy.alpha_beta_search(problem, stats=True)
+            best = min(best, time.perf_counter() - start)
+        result[f"search_d{depth}_ms"] = best * 1e3
+        result[f"search_d{depth}_nodes"] = stats.nodes + stats.leaves
+        result[f"search_d{depth}_move"] = [int(move[0]), int(move[1])]
+    return result
+
+
+def run(positions, depths, max_size_for_depth, repeat, search_repeat):
+    """
+    Chạy benchmark trên toàn bộ thế cờ.
+    Thế cờ có kích thước lớn hơn max_size_for_depth chỉ tìm kiếm ở độ sâu
+    nhỏ nhất để giữ thời gian chạy hợp lý
+    """
+    results = {}
+    for position in positions:
+        position_depths = (
+            depths if position["size"] <= max_size_for_depth else depths[:1]
+        )
+        results[position["name"]] = bench_position(
+            position, position_depths, repeat, search_repeat
+        )
+    return dict(
+        meta=dict(
+            python=platform.python_version(),
+            machine=platform.machine(),
+            depths=depths,
+            time=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        ),
+        results=results,
+    )
+
+
+def compare(report, baseline, threshold):
+    """
+    So sánh với baseline: các chỉ số thời gian (_us, _ms) chậm hơn quá
+    threshold (tỉ lệ) được xem là hồi quy. Số nút thay đổi được báo riêng
+    """
+    regressions = []
+    changes = []
+    for name, metrics in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            if metric not in base:
+                continue
+            if metric.endswith(("_us", "_ms")) and base[metric] > 0:
+                ratio = value / base[metric]
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        dict(
+                            position=name,
+                            metric=metric,
+                            baseline=base[metric],
+                            current=value,
+                            ratio=ratio,
+                        )
+                    )
+            elif metric.endswith(("_nodes", "_move")) and value != base[metric]:
+                changes.append(
+                    dict(
+                        position=name,
+                        metric=metric,
+                        baseline=base[metric],
+                        current=value,
+                    )
+                )
+    return regressions, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe engine benchmark suite")
+    parser.add_argument("--positions", default=POSITIONS)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--max-size-for-depth", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--search-repeat", type=int, default=3)
+    parser.add_argument("--out", default="-", help="JSON report path")
+    parser.add_argument("--baseline", help="compare against a saved report")
+    parser.add_argument("--save-baseline", help="also save the report here")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = run(
+        load_positions(args.positions),
+        args.depths,
+        args.max_size_for_depth,
+        args.repeat,
+        args.search_repeat,
+    )
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions, changes = compare(report, baseline, args.threshold)
+        report["regressions"] = regressions
+        report["changes"] = changes
+        for item in regressions:
+            print(
+                f"REGRESSION {item['position']} {item['metric']}: "
+                f"{item['baseline']:.3f} -> {item['current']:.3f} "
+                f"({item['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        for item in changes:
+            print(
+                f"CHANGED {item['position']} {item['metric']}: "
+                f"{item['baseline']} -> {item['current']}",
+                file=sys.stderr,
+            )
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+from functools import lru_cache
+
+import numpy as np
+from board import DIRECTIONS, Board
+
+
+@lru_cache(maxsize=None)
+def window_table(size, win_length):
+    """
+    Mặt nạ của mọi đoạn win_length ô liên tiếp đi qua từng ô trên bàn cờ
+    size x size (bit của ô (x, y) là x * (size + 1) + y), tính một lần cho
+    mỗi kích thước và độ dài thắng
+    """
+    stride = size + 1
+    windows = {}
+    for x in range(size):
+        for y in range(size):
+            cell = []
+            for dx, dy in DIRECTIONS:
+                for start in range(1 - win_length, 1):
+                    cells = [
+                        (x + (start + t) * dx, y + (start + t) * dy)
+                        for t in range(win_length)
+                    ]
+                    if all(0 <= i < size and 0 <= j < size for i, j in cells):
+                        mask = 0
+                        for i, j in cells:
+                            mask |= 1 << (i * stride + j)
+                        cell.append(mask)
+            windows[(x, y)] = tuple(cell)
+    return windows
+
+
+class BitBoard(Board):
+    """
+    Bàn cờ biểu diễn bằng bitboard: mỗi người chơi có một số nguyên làm mặt nạ,
+    ô (x, y) ứng với bit x * (size + 1) + y.
+    Mỗi dòng có thêm một cột đệm luôn trống nên phép dịch bit theo các hướng
+    không bị tràn sang dòng kế tiếp.
+    Mảng ký tự board không được cập nhật sau mỗi nước đi mà chỉ được dựng lại
+    từ các mặt nạ khi cần (vẽ bàn cờ, tính lại toàn bộ heuristic).
+    """
+
+    def __init__(self, size=8, win_length=4):
+        """
+        Khởi tạo bàn cờ, mặt nạ của từng người chơi và các mặt nạ tiền tính
+        """
+        super().__init__(size, win_length)
+        self.stride = size + 1
+        self.masks = {}
+        self.occupied = 0
+        self.full_mask = 0
+        for x in range(size):
+            for y in range(size):
+                self.full_mask |= 1 << (x * self.stride + y)
+        # Độ dịch bit cho 4 hướng: dòng, cột, đường chéo chính, đường chéo phụ
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+        self.cell_windows = window_table(size, win_length)
+        self.bits = [
+            1 << (x * self.stride + y) for x in range(size) for y in range(size)
+        ]
+
+    @property
+    def board(self):
+        """
+        Mảng ký tự của bàn cờ, dựng lại từ các mặt nạ nếu đã có nước đi mới
+        """
+        if self.grid is None:
+            grid = np.full((self.size, self.size), self.empty, dtype=str)
+            for x, y in self.moves:
+                grid[x][y] = self.player_at(x, y)
+            self.grid = grid
+        return self.grid
+
+    @board.setter
+    def board(self, grid):
+        self.grid = grid
+
+    def bit(self, x, y):
+        """
+        Bit ứng với ô (x, y)
+        """
+        return self.bits[int(x) * self.size + int(y)]
+
+    def is_valid_move(self, move):
+        """
+        Kiểm tra nước đi có hợp lệ
+        """
+        x, y = move
+        return (
+            0 <= x < self.size
+            and 0 <= y < self.size
+            and not self.occupied & self.bit(x, y)
+        )
+
+    def make_move(self, x, y, player):
+        """
+        Thực hiện nước đi của player: chỉ cập nhật các mặt nạ, mảng board
+        được dựng lại khi cần
+        """
+        x, y = int(x), int(y)
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return False
+        bit = self.bits[x * self.size + y]
+        if self.occupied & bit:
+            return False
+        self.masks[player] = self.masks.get(player, 0) | bit
+        self.occupied |= bit
+        self.grid = None
+        self.moves.append((x, y))
+        for listener in self.listeners:
+            listener.on_move(x, y, player)
+        return True
+
+    def undo_move(self, x, y):
+        """
+        Xóa nước đi tại vị trí (x, y), người chơi được lấy từ các mặt nạ
+        """
+        x, y = int(x), int(y)
+        bit = self.bits[x * self.size + y]
+        if not self.occupied & bit:
+            return
+        for player, mask in self.masks.items():
+            if mask & bit:
+                break
+        self.masks[player] = mask & ~bit
+        self.occupied &= ~bit
+        self.grid = None
+        self.forget_move(x, y)
+        for listener in self.listeners:
+            listener.on_undo(x, y, player)
+
+    def player_at(self, x, y):
+        """
+        Quân cờ tại ô (x, y), lấy từ các mặt nạ (empty nếu ô trống)
+        """
+        bit = self.bit(x, y)
+        if self.occupied & bit:
+            for player, mask in self.masks.items():
+                if mask & bit:
+                    return player
+        return self.empty
+
+    def has_won(self, player):
+        """
+        Kiểm tra player có win_length quân liên tiếp bằng các phép dịch bit
+        """
+        mask = self.masks.get(player, 0)
+        for shift in self.shifts:
+            run = mask
+            for _ in range(self.win_length - 1):
+                run &= run >> shift
+            if run:
+                return True
+        return False
+
+    def is_win_at(self, x, y):
+        """
+        Kiểm tra quân cờ tại (x, y) có nằm trong win_length quân liên tiếp không
+        """
+        player = self.player_at(x, y)
+        if player == self.empty:
+            return False
+        mask = self.masks[player]
+        windows = self.cell_windows[(int(x), int(y))]
+        return any((mask & window) == window for window in windows)
+
+    def is_winning_cell(self, x, y, player):
+        """
+        Kiểm tra nếu player đặt quân tại (x, y) thì có win_length quân liên tiếp
+        không
+        """
+        mask = self.masks.get(player, 0) | self.bit(x, y)
+        windows = self.cell_windows[(int(x), int(y))]
+        return any((mask & window) == window for window in windows)
+
+    def is_full(self):
+        """
+        Kiểm tra bàn cờ đã đầy chưa
+        """
+        return self.occupied == self.full_mask
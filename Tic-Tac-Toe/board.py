@@ -1,4 +1,8 @@
 import numpy as np
+from lines import line_table
+
+# Các hướng của một đường thẳng: dòng, cột, đường chéo chính, đường chéo phụ
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
 
 
 class Board:
@@ -6,14 +10,18 @@ class Board:
     Quản lý bàn cờ và các hàm liên quan
     """
 
-    def __init__(self, size=8):
+    def __init__(self, size=8, win_length=4):
         """
         Khởi tạo bàn cờ với kích thước size x size
-        HEURISTIC: mảng 2 chiều lưu giá trị heuristic cho mỗi ô
+        win_length: số quân liên tiếp cần để thắng
         """
         self.size = size
         self.empty = "·"
         self.board = np.full((self.size, self.size), self.empty, dtype=str)
+        self.win_length = win_length
+        self.lines, self.cell_lines, self.cell_offsets = line_table(size)
+        self.moves = []
+        self.listeners = []
 
     def draw(self):
         """
@@ -37,33 +45,116 @@ class Board:
         """
         Thực hiện nước đi của player
         """
-        if self.is_valid_move((x, y)):
-            self.board[x][y] = player
-            return True
-        return False
+        if not self.is_valid_move((x, y)):
+            return False
+        x, y = int(x), int(y)
+        self.place(x, y, player)
+        self.moves.append((x, y))
+        for listener in self.listeners:
+            listener.on_move(x, y, player)
+        return True
 
     def undo_move(self, x, y):
         """
         Xóa nước đi tại vị trí (x, y)
         """
+        x, y = int(x), int(y)
+        player = self.player_at(x, y)
+        if player == self.empty:
+            return
+        self.remove(x, y)
+        self.forget_move(x, y)
+        for listener in self.listeners:
+            listener.on_undo(x, y, player)
+
+    def place(self, x, y, player):
+        """
+        Đặt quân của player vào ô (x, y)
+        """
+        self.board[x][y] = player
+
+    def remove(self, x, y):
+        """
+        Nhấc quân cờ khỏi ô (x, y)
+        """
         self.board[x][y] = self.empty
 
+    def player_at(self, x, y):
+        """
+        Quân cờ tại ô (x, y) (empty nếu ô trống)
+        """
+        return self.board[x][y]
+
+    def add_listener(self, listener):
+        """
+        Đăng ký đối tượng được báo mỗi khi có nước đi hoặc hoàn tác.
+        listener cần có on_move(x, y, player) và on_undo(x, y, player)
+        """
+        self.listeners.append(listener)
+
+    def forget_move(self, x, y):
+        """
+        Xóa (x, y) khỏi lịch sử nước đi, thường là nước đi cuối cùng
+        """
+        move = (x, y)
+        if self.moves and self.moves[-1] == move:
+            self.moves.pop()
+        else:
+            self.moves.remove(move)
+
+    @property
+    def last_move(self):
+        """
+        Nước đi cuối cùng trên bàn cờ (None nếu bàn cờ trống)
+        """
+        return self.moves[-1] if self.moves else None
+
     def get_all_lines(self):
         """
         Lấy tất cả các dòng, cột, đường chéo trên bàn cờ
         """
-        lines = []
-        for row in self.board:
-            lines.append("".join(row))
-        for col in range(self.size):
-            lines.append("".join(self.board[:, col]))
-        for d in range(-self.size + 1, self.size):
-            lines.append("".join(self.board.diagonal(d)))
-            lines.append("".join(np.fliplr(self.board).diagonal(d)))
-        return lines
+        cells = self.board.ravel().tolist()
+        return ["".join([cells[i] for i in line]) for line in self.lines]
+
+    def has_won(self, player):
+        """
+        Kiểm tra player có win_length quân liên tiếp trên một dòng, cột hoặc
+        đường chéo
+        """
+        run = player * self.win_length
+        return any(run in line for line in self.get_all_lines())
+
+    def is_win_at(self, x, y):
+        """
+        Kiểm tra quân cờ tại (x, y) có nằm trong win_length quân liên tiếp
+        không. Chỉ xét 4 đường thẳng đi qua ô (x, y)
+        """
+        player = self.player_at(x, y)
+        if player == self.empty:
+            return False
+        return self.is_winning_cell(x, y, player)
+
+    def is_winning_cell(self, x, y, player):
+        """
+        Kiểm tra nếu player đặt quân tại (x, y) thì có win_length quân liên
+        tiếp không (không thay đổi bàn cờ). Đi dọc 4 đường qua ô theo bảng
+        chỉ số của lines.line_table
+        """
+        cells = self.board.ravel()
+        index = x * self.size + y
+        for line_id, offset in zip(self.cell_lines[index], self.cell_offsets[index]):
+            line = self.lines[line_id]
+            start = end = offset
+            while start > 0 and cells[line[start - 1]] == player:
+                start -= 1
+            while end < len(line) - 1 and cells[line[end + 1]] == player:
+                end += 1
+            if end - start + 1 >= self.win_length:
+                return True
+        return False
 
     def is_full(self):
         """
         Kiểm tra bàn cờ đã đầy chưa
         """
-        return not np.any(self.board == self.empty)
+        return len(self.moves) == self.size * self.size
@@ -0,0 +1,247 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from problem import Problem
+from search import SearchStrategy
+from symmetry import restore_move, transform_move
+
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.npy")
+# Kết quả tìm kiếm ghi thêm trong lúc chơi (không nằm trong repo)
+LOCAL_BOOK = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "opening_book.local.npy"
+)
+
+# Mỗi mục của sổ khai cuộc: hash Zobrist của thế cờ, kích thước bàn cờ, số
+# quân liên tiếp để thắng, độ sâu tìm kiếm, nước đi tốt nhất (chỉ số ô trên
+# chính thế cờ đó) và giá trị
+RECORD = np.dtype(
+    [
+        ("key", "<u8"),
+        ("size", "u1"),
+        ("win_length", "u1"),
+        ("depth", "i1"),
+        ("move", "<i2"),
+        ("value", "<f8"),
+    ]
+)
+
+
+class PositionBook:
+    """
+    Sổ khai cuộc và bộ nhớ đệm kết quả tìm kiếm lưu trên đĩa.
+    Các thế cờ được đánh chỉ số bằng hash Zobrist kèm bên đến lượt đi. File
+    .npy được sắp xếp theo hash và mở bằng memory map nên nạp gần như tức
+    thì, các tiến trình đọc chung một file. Kết quả mới được giữ trong bộ nhớ
+    cho đến khi gọi save()
+    """
+
+    def __init__(self, path=BOOK, min_depth=2, symmetric=False, save_path=None):
+        """
+        path: file sổ khai cuộc (None hoặc chưa tồn tại: sổ rỗng)
+        min_depth: chỉ lưu kết quả tìm kiếm có độ sâu ít nhất min_depth
+        symmetric: nếu True, tra và lưu theo hash chính tắc (gộp 8 thế cờ đối
+            xứng). Chỉ nên bật khi hàm đánh giá đối xứng; bảng UTILITY hiện
+            tại chấm một đường khác nhau theo hai chiều đọc nên mặc định chỉ
+            dùng mục của đúng thế cờ
+        save_path: file riêng để ghi các kết quả mới (None: ghi vào path).
+            File này được nạp thêm nếu đã tồn tại, còn path chỉ được đọc
+        """
+        self.path = path
+        self.min_depth = min_depth
+        self.symmetric = symmetric
+        self.save_path = save_path
+        self.records = load_records(path)
+        self.local = load_records(save_path)
+        self.pending = {}
+
+    def __len__(self):
+        return len(self.records) + len(self.local) + len(self.pending)
+
+    def position_key(self, problem, player):
+        """
+        (hash của thế cờ khi player đến lượt, phép đối xứng đưa thế cờ về thế
+        cờ được lưu). Không dùng đối xứng thì là hash Zobrist và phép đồng nhất
+        """
+        if self.symmetric:
+            key, t = problem.symmetry.canonical()
+        else:
+            key, t = problem.hash_board(), 0
+        if player == "O":
+            key ^= problem.zobrist.side_key
+        return key, t
+
+    def find(self, key, rules):
+        """
+        Mục (depth, move, value) của hash key với luật rules = (size,
+        win_length), None nếu không có
+        """
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = lookup(self.local, key)
+        if entry is None:
+            entry = lookup(self.records, key)
+        if entry is None or tuple(entry[:2]) != rules:
+            return None
+        return entry[2:]
+
+    def probe(self, problem, player, min_depth=0):
+        """
+        Nước đi đã lưu cho player ở thế cờ hiện tại (hoặc một thế cờ đối xứng
+        nếu symmetric).
+        Trả về (move, depth, value) hoặc None nếu không có mục nào được tìm
+        với độ sâu ít nhất min_depth
+        """
+        size = problem.board.size
+        key, t = self.position_key(problem, player)
+        entry = self.find(key, (size, problem.board.win_length))
+        if entry is None or entry[0] < min_depth:
+            return None
+        depth, move, value = entry
+        move = restore_move(divmod(move, size), size, t)
+        if not problem.board.is_valid_move(move):
+            return None
+        return move, depth, value
+
+    def store(self, problem, player, move, depth, value):
+        """
+        Lưu nước đi tốt nhất của player ở thế cờ hiện tại (giữ mục sâu hơn)
+        """
+        if move is None or depth < self.min_depth:
+            return
+        size, win_length = problem.board.size, problem.board.win_length
+        key, t = self.position_key(problem, player)
+        old = self.find(key, (size, win_length))
+        if old is not None and old[0] > depth:
+            return
+        x, y = transform_move(move, size, t)
+        self.pending[key] = (size, win_length, depth, x * size + y, value)
+
+    def save(self, path=None):
+        """
+        Ghi các mục mới ra file rồi mở lại bằng memory map. Có save_path thì
+        chỉ ghi các mục đã ghi thêm trước đó và các mục mới vào save_path,
+        ngược lại ghi toàn bộ sổ vào path. File được ghi tạm rồi đổi tên nên
+        tiến trình khác đang đọc file cũ không bị ảnh hưởng
+        """
+        if self.save_path is not None and path is None:
+            self.local = write_records(self.save_path, self.local, self.pending)
+        else:
+            path = path or self.path
+            if path is None:
+                raise ValueError("No path to save the position book")
+            self.records = write_records(path, self.records, self.pending)
+            self.path = path
+        self.pending = {}
+
+
+def load_records(path):
+    """
+    Mở file sổ khai cuộc bằng memory map (mảng rỗng nếu chưa có file)
+    """
+    if path is None or not os.path.exists(path):
+        return np.zeros(0, dtype=RECORD)
+    return np.load(path, mmap_mode="r")
+
+
+def lookup(records, key):
+    """
+    Mục (size, win_length, depth, move, value) có hash key trong mảng records
+    đã sắp xếp, None nếu không có
+    """
+    index = np.searchsorted(records["key"], np.uint64(key))
+    if index == len(records) or int(records["key"][index]) != key:
+        return None
+    return records[index].tolist()[1:]
+
+
+def write_records(path, records, pending):
+    """
+    Gộp records với các mục mới pending (sắp xếp theo hash), ghi ra path và
+    trả về mảng được mở lại bằng memory map
+    """
+    merged = {int(record["key"]): record.tolist()[1:] for record in np.asarray(records)}
+    merged.update(pending)
+    records = np.array(
+        [(key,) + tuple(entry) for key, entry in sorted(merged.items())],
+        dtype=RECORD,
+    )
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        np.save(f, records)
+    os.replace(temp, path)
+    return np.load(path, mmap_mode="r")
+
+
+def build_book(book, size=8, plies=4, width=3, depth=2, log=None, win_length=4):
+    """
+    Tìm trước nước đi tốt nhất cho các thế cờ khai cuộc: bắt đầu từ bàn cờ
+    trống (X đi trước), mở rộng width nước đi tốt nhất theo Problem.sort_moves
+    của mỗi thế cờ đến plies nước. Mỗi thế cờ (theo book.position_key) chỉ
+    được tìm một lần.
+    Trả về số thế cờ đã tìm
+    """
+    seen = set()
+    frontier = [[]]
+    searched = 0
+    for ply in range(plies):
+        player = "X" if ply % 2 == 0 else "O"
+        opponent = "O" if player == "X" else "X"
+        problem = Problem(size, human_player=opponent, win_length=win_length)
+        strategy = SearchStrategy(depth)
+        next_frontier = []
+        for moves in frontier:
+            problem.load_moves(moves)
+            key, _ = book.position_key(problem, player)
+            if key in seen:
+                continue
+            seen.add(key)
+            found = book.probe(problem, player, depth)
+            if found is None:
+                move = strategy.alpha_beta_search(problem)
+                book.store(problem, player, move, depth, strategy.root_value)
+                searched += 1
+            for x, y in problem.sort_moves()[:width]:
+                next_frontier.append(moves + [(x, y, player)])
+        if log is not None:
+            print(f"ply {ply}: {len(frontier)} positions", file=log)
+        frontier = next_frontier
+    return searched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the opening book")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--win-length", type=int, default=4)
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--width", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--out", default=BOOK)
+    parser.add_argument(
+        "--symmetric", action="store_true", help="merge symmetric positions"
+    )
+    args = parser.parse_args()
+
+    book = PositionBook(args.out, min_depth=args.depth, symmetric=args.symmetric)
+    start = time.perf_counter()
+    searched = build_book(
+        book,
+        args.size,
+        args.plies,
+        args.width,
+        args.depth,
+        log=sys.stderr,
+        win_length=args.win_length,
+    )
+    book.save()
+    print(
+        f"searched {searched} positions, {len(book)} entries, "
+        f"{time.perf_counter() - start:.1f}s -> {args.out}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
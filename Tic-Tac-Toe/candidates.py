@@ -0,0 +1,64 @@
+class CandidateMoves:
+    """
+    Tập các ô trống nằm trong bán kính radius (theo cả hai chiều) của ít nhất
+    một quân cờ đã đặt. Cập nhật dần sau mỗi nước đi/hoàn tác.
+    """
+
+    def __init__(self, board, radius=2):
+        """
+        board: bàn cờ cần theo dõi
+        radius: bán kính lân cận
+        """
+        self.size = board.size
+        self.radius = radius
+        cells = self.size * self.size
+        self.neighbours = [self.generate_neighbours(i) for i in range(cells)]
+        self.counts = [0] * cells
+        self.occupied = [False] * cells
+        self.cells = set()
+        for x, y in board.moves:
+            self.on_move(x, y, board.player_at(x, y))
+        board.add_listener(self)
+
+    def generate_neighbours(self, index):
+        """
+        Các ô (khác ô index) trong bán kính radius của ô index
+        """
+        x, y = divmod(index, self.size)
+        return [
+            i * self.size + j
+            for i in range(max(0, x - self.radius), min(self.size, x + self.radius + 1))
+            for j in range(max(0, y - self.radius), min(self.size, y + self.radius + 1))
+            if (i, j) != (x, y)
+        ]
+
+    def on_move(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi nước đi
+        """
+        index = x * self.size + y
+        self.occupied[index] = True
+        self.cells.discard(index)
+        for i in self.neighbours[index]:
+            self.counts[i] += 1
+            if self.counts[i] == 1 and not self.occupied[i]:
+                self.cells.add(i)
+
+    def on_undo(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi lần hoàn tác
+        """
+        index = x * self.size + y
+        self.occupied[index] = False
+        for i in self.neighbours[index]:
+            self.counts[i] -= 1
+            if self.counts[i] == 0:
+                self.cells.discard(i)
+        if self.counts[index] > 0:
+            self.cells.add(index)
+
+    def moves(self):
+        """
+        Danh sách các ô ứng viên (x, y)
+        """
+        return [divmod(index, self.size) for index in self.cells]
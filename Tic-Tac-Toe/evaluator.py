@@ -0,0 +1,137 @@
+from lines import line_table
+
+
+class IncrementalEvaluator:
+    """
+    Đánh giá trạng thái game theo kiểu cập nhật dần.
+    Lưu chuỗi x/e/b và điểm pattern của từng đường cho mỗi người chơi; mỗi
+    khi có nước đi hoặc hoàn tác chỉ thay một ký tự trên 4 đường đi qua ô
+    vừa thay đổi rồi tính lại điểm của các đường đó.
+    Kết quả trùng với Problem.calculate_heuristic trên cùng bảng UTILITY.
+    """
+
+    def __init__(self, board, players, heuristic, line_score):
+        """
+        board: bàn cờ cần theo dõi (Board hoặc BitBoard)
+        players: hai người chơi, ví dụ ("X", "O")
+        heuristic: mảng giá trị vị trí của từng ô (Problem.HEURISTIC)
+        line_score: hàm tính điểm pattern của một đường đã dịch sang x/e/b
+        """
+        self.size = board.size
+        self.empty = board.empty
+        self.players = tuple(players)
+        self.heuristic = [int(v) for v in heuristic.ravel()]
+        self.line_score = line_score
+        self.lines, self.cell_lines, self.cell_offsets = line_table(self.size)
+        self.refresh(board)
+        board.add_listener(self)
+
+    def refresh(self, board):
+        """
+        Tính lại toàn bộ điểm từ trạng thái hiện tại của bàn cờ
+        """
+        self.cells = [str(c) for c in board.board.ravel()]
+        self.strings = {}
+        self.line_scores = {}
+        self.sequence_score = {}
+        self.position_score = {}
+        for player in self.players:
+            strings = [self.translate(line, player) for line in self.lines]
+            scores = [self.line_score(string) for string in strings]
+            self.strings[player] = strings
+            self.line_scores[player] = scores
+            self.sequence_score[player] = sum(scores)
+            self.position_score[player] = sum(
+                h for c, h in zip(self.cells, self.heuristic) if c == player
+            )
+
+    def translate(self, line, player):
+        """
+        Chuỗi x/e/b của một đường theo góc nhìn của player
+        """
+        cells = self.cells
+        empty = self.empty
+        return "".join(
+            "x" if cells[i] == player else "e" if cells[i] == empty else "b"
+            for i in line
+        )
+
+    def char(self, value, player):
+        """
+        Ký tự của giá trị ô value theo góc nhìn của player
+        """
+        if value == player:
+            return "x"
+        return "e" if value == self.empty else "b"
+
+    def update_cell(self, x, y, value):
+        """
+        Cập nhật ô (x, y) và tính lại các đường đi qua ô đó
+        """
+        index = x * self.size + y
+        self.cells[index] = value
+        line_ids = self.cell_lines[index]
+        offsets = self.cell_offsets[index]
+        line_score = self.line_score
+        for player in self.players:
+            char = self.char(value, player)
+            strings = self.strings[player]
+            scores = self.line_scores[player]
+            delta = 0
+            for line_id, offset in zip(line_ids, offsets):
+                string = strings[line_id]
+                string = string[:offset] + char + string[offset + 1 :]
+                strings[line_id] = string
+                new_score = line_score(string)
+                delta += new_score - scores[line_id]
+                scores[line_id] = new_score
+            self.sequence_score[player] += delta
+
+    def move_gain(self, x, y, player):
+        """
+        Điểm đe dọa nếu player đặt quân tại ô trống (x, y): điểm pattern
+        player tăng thêm cộng với điểm pattern đối thủ bị mất.
+        Chỉ thay ký tự của ô trên 4 đường qua ô, không thay đổi trạng thái
+        """
+        index = x * self.size + y
+        line_ids = self.cell_lines[index]
+        offsets = self.cell_offsets[index]
+        line_score = self.line_score
+        gain = 0
+        for other in self.players:
+            char = "x" if other == player else "b"
+            strings = self.strings[other]
+            scores = self.line_scores[other]
+            delta = 0
+            for line_id, offset in zip(line_ids, offsets):
+                string = strings[line_id]
+                delta += (
+                    line_score(string[:offset] + char + string[offset + 1 :])
+                    - scores[line_id]
+                )
+            gain += delta if other == player else -delta
+        return gain
+
+    def on_move(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi nước đi
+        """
+        self.update_cell(x, y, player)
+        if player in self.position_score:
+            self.position_score[player] += self.heuristic[x * self.size + y]
+
+    def on_undo(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi lần hoàn tác
+        """
+        self.update_cell(x, y, self.empty)
+        if player in self.position_score:
+            self.position_score[player] -= self.heuristic[x * self.size + y]
+
+    def score(self, player, opponent, opponent_factor):
+        """
+        Giá trị heuristic của trạng thái hiện tại theo góc nhìn của player
+        """
+        player_score = self.sequence_score[player] + self.position_score[player]
+        opponent_score = self.sequence_score[opponent] + self.position_score[opponent]
+        return player_score - opponent_factor * opponent_score
@@ -1,6 +1,10 @@
+import argparse
 import os
 
+from bitboard import BitBoard
+from book import BOOK, LOCAL_BOOK, PositionBook
 from problem import Problem
+from ponder import Ponderer
 from search import SearchStrategy
 
 
@@ -8,13 +12,25 @@ class Game:
     '''
     Quản lý game và các hàm liên quan
     '''
-    def __init__(self, ai_starts=False):
+    def __init__(
+        self, ai_starts=False, book_path=BOOK, size=8, win_length=4, ponder=False
+    ):
         '''
         Khởi tạo game với bàn cờ kích thước size x size
+        book_path: file sổ khai cuộc (None: không dùng). Kết quả tìm kiếm mới
+            được ghi vào LOCAL_BOOK, không ghi vào book_path
+        win_length: số quân liên tiếp cần để thắng (ví dụ 15 x 15, 5 quân)
+        ponder: nếu True, AI tìm kiếm trước trong lúc chờ người chơi nhập nước đi
         '''
-        self.problem = Problem()
+        self.problem = Problem(size, win_length=win_length, board_class=BitBoard)
         self.board = self.problem.board
-        self.strategy = SearchStrategy()
+        self.book = (
+            PositionBook(book_path, save_path=LOCAL_BOOK) if book_path else None
+        )
+        self.strategy = SearchStrategy(
+            tt_size=1 << 18 if ponder else None, book=self.book
+        )
+        self.ponderer = Ponderer(self.strategy) if ponder else None
         self.ai_starts = ai_starts
 
         if self.ai_starts:
@@ -28,6 +44,8 @@ class Game:
             os.system('cls' if os.name == 'nt' else 'clear')
             self.board.draw()
             if self.problem.current_player == self.problem.human_player:
+                if self.ponderer is not None:
+                    self.ponderer.start(self.problem)
                 x, y = map(int, input("Enter your move: ").split())
                 if self.board.make_move(x, y, self.problem.human_player):
                     self.problem.switch_player()
@@ -35,10 +53,20 @@ class Game:
                     print("Invalid move")
             else:
                 print("AI Turn")
-                move = self.strategy.alpha_beta_search(self.problem)
+                move = None
+                if self.ponderer is not None and self.board.last_move is not None:
+                    move = self.ponderer.lookup(
+                        self.board.last_move, self.strategy.max_depth
+                    )
+                if move is None:
+                    move = self.strategy.alpha_beta_search(self.problem)
                 self.board.make_move(move[0], move[1], self.problem.ai_player)
                 self.problem.switch_player()
-                
+
+        if self.ponderer is not None:
+            self.ponderer.stop()
+        if self.book is not None and self.book.pending:
+            self.book.save()
         os.system('cls' if os.name == 'nt' else 'clear')
         self.board.draw()
         if self.problem.check_winner(self.problem.human_player):
@@ -50,8 +78,15 @@ class Game:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe against the AI")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--win-length", type=int, default=4)
+    parser.add_argument("--ponder", action="store_true")
+    args = parser.parse_args()
     ai_starts = (
         input("Do you want AI to start first? (yes/no): ").strip().lower() == "yes"
     )
-    game = Game(ai_starts)
+    game = Game(
+        ai_starts, size=args.size, win_length=args.win_length, ponder=args.ponder
+    )
     game.play()
@@ -0,0 +1,40 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def line_table(size):
+    """
+    Tạo bảng các dòng, cột, đường chéo của bàn cờ size x size (tính một lần
+    cho mỗi kích thước). Thứ tự các đường giống Problem.generate_lines
+    Trả về (lines, cell_lines, cell_offsets):
+        lines: tuple các đường, mỗi đường là tuple chỉ số ô x * size + y
+        cell_lines: với mỗi ô, tuple chỉ số của 4 đường đi qua ô đó
+        cell_offsets: với mỗi ô, vị trí của ô trên từng đường trong cell_lines
+    """
+    lines = []
+    for x in range(size):
+        lines.append(tuple(x * size + y for y in range(size)))
+    for y in range(size):
+        lines.append(tuple(x * size + y for x in range(size)))
+    for d in range(-size + 1, size):
+        lines.append(tuple(x * size + x + d for x in range(size) if 0 <= x + d < size))
+        lines.append(
+            tuple(
+                x * size + size - 1 - x - d
+                for x in range(size)
+                if 0 <= size - 1 - x - d < size
+            )
+        )
+
+    cell_lines = [[] for _ in range(size * size)]
+    cell_offsets = [[] for _ in range(size * size)]
+    for line_id, line in enumerate(lines):
+        for offset, cell in enumerate(line):
+            cell_lines[cell].append(line_id)
+            cell_offsets[cell].append(offset)
+
+    return (
+        tuple(lines),
+        tuple(tuple(ids) for ids in cell_lines),
+        tuple(tuple(offsets) for offsets in cell_offsets),
+    )
@@ -0,0 +1,231 @@
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import BitBoard
+from book import PositionBook
+from ordering import MoveOrdering
+from problem import Problem
+from search import SearchStrategy
+from threats import ThreatSolver
+
+
+def build_strategy(config):
+    """
+    Tạo SearchStrategy từ cấu hình dạng dict (có thể đọc từ JSON).
+    Khóa "ordering" là dict tham số của MoveOrdering, khóa "threat_solver" là
+    dict tham số của ThreatSolver, khóa "book" là đường dẫn sổ khai cuộc
+    (mở chỉ đọc bằng memory map), khóa "name" bị bỏ qua
+    """
+    options = {k: v for k, v in config.items() if k != "name"}
+    if isinstance(options.get("ordering"), dict):
+        options["ordering"] = MoveOrdering(**options["ordering"])
+    if isinstance(options.get("threat_solver"), dict):
+        options["threat_solver"] = ThreatSolver(**options["threat_solver"])
+    if isinstance(options.get("book"), str):
+        options["book"] = PositionBook(options["book"])
+    return SearchStrategy(**options)
+
+
+def random_opening(rng, size, count):
+    """
+    Sinh count nước mở đầu ngẫu nhiên gần trung tâm để các ván khác nhau
+    """
+    low, high = size // 2 - 2, size // 2 + 2
+    cells = [
+        (x, y)
+        for x in range(max(0, low), min(size, high))
+        for y in range(max(0, low), min(size, high))
+    ]
+    return rng.sample(cells, min(count, len(cells)))
+
+
+def play_game(game_id, config_x, config_o, size=8, opening=2, seed=0, win_length=4):
+    """
+    Chơi một ván giữa hai cấu hình (X đi trước), không cần bàn phím/màn hình.
+    Mỗi bên có Problem riêng (theo góc nhìn của mình), nước đi được áp dụng
+    cho cả hai. Trả về kết quả ván dưới dạng dict
+    """
+    rng = random.Random(seed * 100003 + game_id)
+    configs = {"X": config_x, "O": config_o}
+    problems = {
+        "X": Problem(size, "O", win_length=win_length, board_class=BitBoard),
+        "O": Problem(size, "X", win_length=win_length, board_class=BitBoard),
+    }
+    strategies = {player: build_strategy(configs[player]) for player in "XO"}
+    times = {"X": [], "O": []}
+    nodes = {"X": 0, "O": 0}
+    moves = []
+
+    player = "X"
+    winner = None
+    start = time.perf_counter()
+    for x, y in random_opening(rng, size, opening):
+        for problem in problems.values():
+            problem.board.make_move(x, y, player)
+        moves.append((x, y))
+        player = "O" if player == "X" else "X"
+
+    while True:
+        problem = problems[player]
+        if problem.check_winner("O" if player == "X" else "X"):
+            winner = "O" if player == "X" else "X"
+            break
+        if problem.board.is_full():
+            break
+        move_start = time.perf_counter()
+        move, stats = strategies[player].alpha_beta_search(problem, stats=True)
+        times[player].append(time.perf_counter() - move_start)
+        nodes[player] += stats.nodes + stats.leaves
+        x, y = int(move[0]), int(move[1])
+        for other in problems.values():
+            other.board.make_move(x, y, player)
+        moves.append((x, y))
+        player = "O" if player == "X" else "X"
+
+    for strategy in strategies.values():
+        strategy.close()
+    return dict(
+        game=game_id,
+        x=config_x.get("name", "x"),
+        o=config_o.get("name", "o"),
+        winner=winner,
+        plies=len(moves),
+        opening=opening,
+        time=time.perf_counter() - start,
+        x_move_time=sum(times["X"]) / len(times["X"]) if times["X"] else 0.0,
+        o_move_time=sum(times["O"]) / len(times["O"]) if times["O"] else 0.0,
+        x_max_move_time=max(times["X"], default=0.0),
+        o_max_move_time=max(times["O"], default=0.0),
+        x_nodes=nodes["X"],
+        o_nodes=nodes["O"],
+        moves=moves,
+    )
+
+
+def play_match_game(args):
+    """
+    Ván thứ game_id của trận: hai cấu hình đổi màu quân sau mỗi ván.
+    Kết quả có thêm a_player: quân của cấu hình a trong ván
+    """
+    game_id, config_a, config_b, size, opening, seed, win_length = args
+    a_player = "X" if game_id % 2 == 0 else "O"
+    if a_player == "O":
+        config_a, config_b = config_b, config_a
+    result = play_game(game_id, config_a, config_b, size, opening, seed, win_length)
+    return dict(result, a_player=a_player)
+
+
+def run_match(
+    config_a, config_b, games, workers=1, size=8, opening=2, seed=0, win_length=4
+):
+    """
+    Chơi games ván giữa hai cấu hình trên pool tiến trình.
+    Trả về (danh sách kết quả từng ván, tổng kết)
+    """
+    tasks = [
+        (game_id, config_a, config_b, size, opening, seed, win_length)
+        for game_id in range(games)
+    ]
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(play_match_game, tasks))
+    else:
+        results = [play_match_game(task) for task in tasks]
+    elapsed = time.perf_counter() - start
+    return results, summarize(results, config_a, config_b, elapsed)
+
+
+def summarize(results, config_a, config_b, elapsed):
+    """
+    Tổng kết trận đấu theo góc nhìn của cấu hình a (thắng thua được tính theo
+    quân của a trong từng ván, không theo tên cấu hình)
+    """
+    name_a = config_a.get("name", "a")
+    wins = losses = draws = 0
+    for result in results:
+        if result["winner"] is None:
+            draws += 1
+            continue
+        if result["winner"] == result["a_player"]:
+            wins += 1
+        else:
+            losses += 1
+    return dict(
+        a=name_a,
+        b=config_b.get("name", "b"),
+        games=len(results),
+        a_wins=wins,
+        b_wins=losses,
+        draws=draws,
+        score=(wins + 0.5 * draws) / len(results) if results else 0.0,
+        elapsed=elapsed,
+        games_per_second=len(results) / elapsed if elapsed else 0.0,
+    )
+
+
+def write_results(results, path, fmt="jsonl"):
+    """
+    Ghi kết quả từng ván ra file JSONL hoặc CSV (path "-" là stdout)
+    """
+    output = sys.stdout if path == "-" else open(path, "w", newline="")
+    try:
+        if fmt == "csv":
+            fields = [key for key in results[0] if key != "moves"] if results else []
+            writer = csv.DictWriter(output, fieldnames=fields + ["moves"])
+            writer.writeheader()
+            for result in results:
+                row = dict(result)
+                row["moves"] = " ".join(f"{x},{y}" for x, y in result["moves"])
+                writer.writerow(row)
+        else:
+            for result in results:
+                output.write(json.dumps(result, separators=(",", ":")) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Tic-Tac-Toe match runner")
+    parser.add_argument(
+        "--a", default='{"name": "a", "max_depth": 1}', help="JSON config of engine a"
+    )
+    parser.add_argument(
+        "--b", default='{"name": "b", "max_depth": 1}', help="JSON config of engine b"
+    )
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--win-length", type=int, default=4)
+    parser.add_argument("--opening", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="-")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    args = parser.parse_args()
+
+    config_a = json.loads(args.a)
+    config_b = json.loads(args.b)
+    config_a.setdefault("name", "a")
+    config_b.setdefault("name", "b")
+    results, summary = run_match(
+        config_a,
+        config_b,
+        args.games,
+        workers=args.workers,
+        size=args.size,
+        opening=args.opening,
+        seed=args.seed,
+        win_length=args.win_length,
+    )
+    write_results(results, args.out, args.format)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
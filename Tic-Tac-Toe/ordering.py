@@ -0,0 +1,80 @@
+class MoveOrdering:
+    """
+    Sắp xếp nước đi cho Alpha-Beta Pruning:
+        - nước đi tốt nhất từ bảng chuyển vị
+        - killer move: nước đi gây cắt tỉa ở cùng tầng
+        - điểm đe dọa: thay đổi điểm pattern khi đặt quân (tấn công + chặn),
+          chỉ tính khi còn ít nhất threat_min_depth tầng tìm kiếm
+        - history: số lần (có trọng số) nước đi gây cắt tỉa, giữ qua nhiều lượt
+    Thứ tự tĩnh của Problem.sort_moves được dùng khi hòa điểm.
+    """
+
+    def __init__(
+        self,
+        threat=True,
+        killers=True,
+        history=True,
+        killer_slots=2,
+        threat_min_depth=2,
+    ):
+        """
+        threat, killers, history: bật/tắt từng tiêu chí
+        killer_slots: số killer move lưu cho mỗi tầng
+        threat_min_depth: chỉ tính điểm đe dọa khi còn ít nhất chừng ấy tầng
+            tìm kiếm, tính cả tầng của các nước đi được sắp xếp (1: luôn tính).
+            Ở các nút sát lá, thứ tự tốt không bù được chi phí tính điểm đe
+            dọa cho mọi nước đi
+        """
+        self.use_threat = threat
+        self.threat_min_depth = threat_min_depth
+        self.use_killers = killers
+        self.use_history = history
+        self.killer_slots = killer_slots
+        self.killers = {}
+        self.history = {}
+
+    def new_search(self):
+        """
+        Gọi khi bắt đầu một lượt tìm kiếm mới: killer move chỉ có ý nghĩa
+        trong cùng một cây tìm kiếm, còn bảng history được giữ lại
+        """
+        self.killers = {}
+
+    def order(self, problem, player, ply, tt_move=None, remaining=None):
+        """
+        Các nước đi hợp lệ của player đã được sắp xếp.
+        remaining: số tầng còn phải tìm, tính cả tầng của các nước đi này
+            (None: không giới hạn)
+        """
+        moves = problem.sort_moves()
+        killers = self.killers.get(ply, ()) if self.use_killers else ()
+        evaluator = problem.evaluator
+        threat = self.use_threat and (
+            remaining is None or remaining >= self.threat_min_depth
+        )
+
+        def key(move):
+            x, y = int(move[0]), int(move[1])
+            return (
+                move == tt_move,
+                (x, y) in killers,
+                evaluator.move_gain(x, y, player) if threat else 0,
+                self.history.get((player, x, y), 0) if self.use_history else 0,
+            )
+
+        return sorted(moves, key=key, reverse=True)
+
+    def cutoff(self, player, move, ply, depth):
+        """
+        Ghi nhận nước đi gây cắt tỉa tại tầng ply, còn depth tầng phía dưới
+        """
+        x, y = int(move[0]), int(move[1])
+        if self.use_killers:
+            killers = self.killers.setdefault(ply, [])
+            if (x, y) not in killers:
+                killers.insert(0, (x, y))
+                del killers[self.killer_slots :]
+        if self.use_history:
+            self.history[(player, x, y)] = (
+                self.history.get((player, x, y), 0) + (depth + 1) ** 2
+            )
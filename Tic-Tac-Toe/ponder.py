@@ -0,0 +1,110 @@
+import threading
+
+from problem import Problem
+from search import SearchStrategy, SearchTimeout
+
+
+class Ponderer:
+    """
+    Tìm kiếm trong lúc chờ người chơi đi (pondering).
+    Một luồng nền đặt thử các nước đáp có khả năng nhất của người chơi rồi
+    tìm nước đi của AI với độ sâu tăng dần, xen kẽ giữa các nước đáp, cho đến
+    khi bị dừng. Bảng chuyển vị được dùng chung với chiến lược chính nên kể cả
+    khi đoán sai, các thế cờ đã tìm vẫn được dùng lại.
+    """
+
+    def __init__(self, strategy, replies=3):
+        """
+        strategy: chiến lược tìm kiếm chính (SearchStrategy); nên có bảng chuyển
+            vị (tt_size) để dùng lại kết quả
+        replies: số nước đáp của người chơi được tìm trước
+        """
+        self.strategy = strategy
+        self.replies = replies
+        self.search = SearchStrategy(
+            algorithm="pvs" if strategy.pvs else "alphabeta",
+            ordering=strategy.ordering,
+        )
+        self.search.table = strategy.table
+        self.search.stop = threading.Event()
+        self.problem = None
+        self.thread = None
+        self.results = {}
+
+    def predicted_replies(self, problem):
+        """
+        Các nước đáp của người chơi có khả năng nhất: ưu tiên nước làm tăng
+        điểm pattern của người chơi và giảm điểm của AI nhiều nhất
+        """
+        human = problem.human_player
+        gain = problem.evaluator.move_gain
+        moves = sorted(
+            problem.sort_moves(), key=lambda move: -gain(move[0], move[1], human)
+        )
+        return moves[: self.replies]
+
+    def start(self, problem):
+        """
+        Bắt đầu ponder từ thế cờ hiện tại (người chơi đến lượt)
+        """
+        self.stop()
+        snapshot = problem.snapshot()
+        if self.problem is None or self.problem.options != snapshot[0]:
+            self.problem = Problem.from_snapshot(snapshot)
+        else:
+            self.problem.load_moves(snapshot[1])
+        if self.problem.is_game_over():
+            return
+        self.results = {}
+        self.search.stop.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Vòng lặp của luồng nền: mỗi độ sâu tìm lần lượt cho từng nước đáp
+        """
+        problem = self.problem
+        board = problem.board
+        search = self.search
+        replies = self.predicted_replies(problem)
+        root_moves = len(board.moves)
+        depth = 0
+        try:
+            while depth < board.size * board.size - root_moves - 1:
+                for reply in replies:
+                    board.make_move(*reply, problem.human_player)
+                    if not problem.is_game_over():
+                        search.depth_limit = depth
+                        previous = self.results.get(reply)
+                        move = search.search_root(
+                            problem, previous[0] if previous else None
+                        )
+                        self.results[reply] = (move, depth)
+                    board.undo_move(*reply)
+                depth += 1
+        except SearchTimeout:
+            pass
+        finally:
+            while len(board.moves) > root_moves:
+                board.undo_move(*board.last_move)
+
+    def stop(self):
+        """
+        Dừng luồng nền và chờ nó kết thúc
+        """
+        if self.thread is not None:
+            self.search.stop.set()
+            self.thread.join()
+            self.thread = None
+
+    def lookup(self, reply, min_depth=0):
+        """
+        Dừng ponder và trả về nước đi của AI đã tìm cho nước đáp reply nếu
+        đã tìm được ít nhất min_depth, ngược lại None
+        """
+        self.stop()
+        result = self.results.get(tuple(reply))
+        if result is None or result[1] < min_depth:
+            return None
+        return result[0]
@@ -1,8 +1,78 @@
-import heapq
-
 import numpy as np
-import regex as re
+from batch import CODES, BatchEvaluator, encode
 from board import Board
+from candidates import CandidateMoves
+from evaluator import IncrementalEvaluator
+from lines import line_table
+from scorer import PatternScorer
+from symmetry import SymmetryHash
+from zobrist import ZobristHash
+
+# UTILITY: giá trị đánh giá cho các trường hợp trên bàn cờ
+UTILITY = {
+    "FourInRow": [
+        10000000,
+        ["xxxx"],
+    ],  # Tăng giá trị của FourInRow để ưu tiên chiến thắng
+    "KillerMove": [1000000, ["exxx", "xxxe"]],
+    "ThreeInRow_OpenBothEnds": [500000, ["exxxe"]],
+    "ThreeInRow_OneOpenEnd": [50000, ["bxxxe", "exxxb"]],
+    "TwoInRow_OpenBothEnds": [5000, ["exxe", "eexx", "xxee"]],
+    "TwoInRow_OneOpenEnd": [1000, ["bxxe", "eexb", "exxb", "bexx"]],
+    "PotentialThreeInRow_OpenBothEnds": [700, ["exexxe", "exxexe", "eexexx"]],
+    "PotentialThreeInRow_OneOpenEnd": [
+        300,
+        ["bxexxe", "bxxexe", "exxexb", "exexxb", "eexexb", "eexbxx"],
+    ],
+    "SinglePiece_OpenBothEnds": [50, ["exee", "eeex"]],
+    "SinglePiece_OneOpenEnd": [40, ["bxe", "eexb"]],
+    "SinglePiece_OneOpenOneBlocked": [20, ["bxe"]],
+    "PotentialTwoInRow_OpenBothEnds": [10, ["exxe"]],
+    "PotentialSinglePiece_OneOpenEnd": [4, ["bxeee", "eeexb"]],
+}
+
+# Điểm của các chuỗi còn thiếu từ 2 quân trở lên trong generate_utility:
+# (hai đầu trống, một đầu trống, có một ô trống xen giữa hai đầu trống,
+# có một ô trống xen giữa một đầu trống)
+RUN_VALUES = [(5000, 1000, 700, 300), (50, 40, 10, 4), (5, 4, 1, 1)]
+
+
+def generate_utility(win_length):
+    """
+    Tạo bảng UTILITY cho luật win_length quân liên tiếp theo cùng các mức điểm
+    của UTILITY (luật 4 quân). Với win_length == 4 dùng nguyên bảng UTILITY
+    """
+    if win_length == 4:
+        return UTILITY
+    k = win_length
+    run = "x" * (k - 1)
+    utility = {
+        f"{k}InRow": [10000000, ["x" * k]],
+        # Thiếu đúng một quân trong một đoạn k ô
+        "KillerMove": [1000000, ["x" * i + "e" + "x" * (k - 1 - i) for i in range(k)]],
+        f"{k - 1}InRow_OpenBothEnds": [500000, ["e" + run + "e"]],
+        f"{k - 1}InRow_OneOpenEnd": [50000, ["b" + run + "e", "e" + run + "b"]],
+    }
+    for length in range(k - 2, 0, -1):
+        values = RUN_VALUES[min(k - 2 - length, len(RUN_VALUES) - 1)]
+        run = "x" * length
+        utility[f"{length}InRow_OpenBothEnds"] = [values[0], ["e" + run + "e"]]
+        utility[f"{length}InRow_OneOpenEnd"] = [
+            values[1],
+            ["b" + run + "e", "e" + run + "b"],
+        ]
+        if length < 2:
+            continue
+        gapped = ["x" * i + "e" + "x" * (length - i) for i in range(1, length)]
+        utility[f"Potential{length}InRow_OpenBothEnds"] = [
+            values[2],
+            ["e" + g + "e" for g in gapped],
+        ]
+        utility[f"Potential{length}InRow_OneOpenEnd"] = [
+            values[3],
+            ["b" + g + "e" for g in gapped] + ["e" + g + "b" for g in gapped],
+        ]
+    return utility
 
 
 class Problem:
@@ -10,16 +80,82 @@ class Problem:
     Quản lý trạng thái của game và các hàm liên quan
     """
 
-    def __init__(self, size=8, human_player="X", opponent_factor=1.05):
+    def __init__(
+        self,
+        size=8,
+        human_player="X",
+        opponent_factor=1.05,
+        board_class=Board,
+        candidate_radius=2,
+        win_length=4,
+    ):
         """
         Khởi tạo trạng thái game
+        board_class: lớp bàn cờ (Board hoặc BitBoard)
+        candidate_radius: chỉ xét các ô trống trong bán kính này quanh các quân
+            đã đặt (None: xét mọi ô trống)
+        win_length: số quân liên tiếp cần để thắng
         """
-        self.board = Board(size)
+        self.options = dict(
+            size=size,
+            human_player=human_player,
+            win_length=win_length,
+            opponent_factor=opponent_factor,
+            board_class=board_class,
+            candidate_radius=candidate_radius,
+        )
+        self.board = board_class(size, win_length)
         self.human_player = human_player
         self.ai_player = "O" if human_player == "X" else "X"
         self.opponent_factor = opponent_factor
         self.current_player = self.human_player
         self.HEURISTIC = self.generate_heuristic(size)
+        self.UTILITY = generate_utility(win_length)
+        self.scorer = PatternScorer(self.UTILITY)
+        self.evaluator = IncrementalEvaluator(
+            self.board, ("X", "O"), self.HEURISTIC, self.scorer.score
+        )
+        self.zobrist = ZobristHash(self.board)
+        self.symmetry = SymmetryHash(self.board, self.zobrist)
+        self.batch_evaluator = BatchEvaluator(
+            self.UTILITY, self.HEURISTIC, self.opponent_factor
+        )
+        self.candidates = (
+            CandidateMoves(self.board, candidate_radius) if candidate_radius else None
+        )
+
+    def snapshot(self):
+        """
+        Trạng thái gọn của game để gửi sang tiến trình khác:
+        (tham số khởi tạo, danh sách nước đi (x, y, player) theo thứ tự)
+        """
+        board = self.board
+        return self.options, [
+            (x, y, str(board.player_at(x, y))) for x, y in board.moves
+        ]
+
+    def load_moves(self, moves):
+        """
+        Đưa bàn cờ về trạng thái gồm đúng các nước đi moves (x, y, player)
+        """
+        board = self.board
+        current = [(x, y, str(board.player_at(x, y))) for x, y in board.moves]
+        if current == list(moves):
+            return
+        while board.moves:
+            board.undo_move(*board.last_move)
+        for x, y, player in moves:
+            board.make_move(x, y, player)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Tạo lại Problem từ kết quả của snapshot()
+        """
+        options, moves = snapshot
+        problem = cls(**options)
+        problem.load_moves(moves)
+        return problem
 
     def generate_heuristic(self, size):
         """
@@ -48,10 +184,15 @@ class Problem:
 
     def check_winner(self, player):
         """
-        Kiểm tra chiến thắng của player
+        Kiểm tra chiến thắng của player.
+        Người thắng chỉ có thể xuất hiện ở nước đi cuối cùng nên chỉ cần xét
+        4 đường thẳng đi qua ô đó
         """
-        lines = self.board.get_all_lines()
-        return np.any(["".join(line).find(player * 4) != -1 for line in lines])
+        last_move = self.board.last_move
+        if last_move is None:
+            return False
+        x, y = last_move
+        return self.board.player_at(x, y) == player and self.board.is_win_at(x, y)
 
     def is_game_over(self):
         """
@@ -71,87 +212,46 @@ class Problem:
 
     def evaluate(self):
         """
-        Hàm đánh giá trạng thái game
-        """
-        return self.calculate_heuristic(self.board.board, self.ai_player)
-
-    def count_patterns_in_lines(self, lines, pattern):
+        Hàm đánh giá trạng thái game.
+        Dùng điểm được cập nhật dần, bằng với
+        calculate_heuristic(self.board.board, self.ai_player)
         """
-        Đếm số lần xuất hiện của pattern trong lines
-        """
-        compiled_pattern = re.compile(pattern)
-        return sum(
-            len(compiled_pattern.findall(line, overlapped=True)) for line in lines
+        return self.evaluator.score(
+            self.ai_player, self.human_player, self.opponent_factor
         )
 
     def generate_lines(self, matrix, player):
         """
         Tạo ra tất cả các dòng, cột, đường chéo trên bàn cờ
         """
-        lines = []
         trans = {player: "x", self.board.empty: "e"}
+        cells = [trans.get(c, "b") for c in matrix.ravel().tolist()]
+        lines, _, _ = line_table(matrix.shape[0])
+        return ["".join([cells[i] for i in line]) for line in lines]
 
-        def translate(arr):
-            return "".join([trans.get(c, "b") for c in arr])
-
-        lines = [translate(row) for row in matrix]
-        lines += [translate(col) for col in matrix.T]
-
-        for i in range(-matrix.shape[0] + 1, matrix.shape[1]):
-            lines += [
-                translate(np.diagonal(matrix, i)),
-                translate(np.diagonal(np.fliplr(matrix), i)),
-            ]
-
-        return lines
-    
     def hash_board(self):
         """
-        Hash bàn cờ
+        Hash Zobrist của bàn cờ, được cập nhật dần sau mỗi nước đi
         """
-        return hash(self.board.board.tostring())
+        return self.zobrist.value
 
-    def calculate_heuristic(self, board, player):
+    def canonical_hash(self):
         """
-        Tính giá trị heuristic của trạng thái game
+        Hash chính tắc của bàn cờ (giống nhau cho mọi thế cờ đối xứng), được
+        cập nhật dần sau mỗi nước đi
         """
+        return self.symmetry.canonical()[0]
 
+    def calculate_heuristic(self, board, player):
+        """
+        Tính giá trị heuristic của trạng thái game
         """
-        UTILITY: giá trị đánh giá cho các trường hợp trên bàn cờ
-        """
-        UTILITY = {
-            "FourInRow": [
-                10000000,
-                ["xxxx"],
-            ],  # Tăng giá trị của FourInRow để ưu tiên chiến thắng
-            "KillerMove": [1000000, ["exxx", "xxxe"]],
-            "ThreeInRow_OpenBothEnds": [500000, ["exxxe"]],
-            "ThreeInRow_OneOpenEnd": [50000, ["bxxxe", "exxxb"]],
-            "TwoInRow_OpenBothEnds": [5000, ["exxe", "eexx", "xxee"]],
-            "TwoInRow_OneOpenEnd": [1000, ["bxxe", "eexb", "exxb", "bexx"]],
-            "PotentialThreeInRow_OpenBothEnds": [700, ["exexxe", "exxexe", "eexexx"]],
-            "PotentialThreeInRow_OneOpenEnd": [
-                300,
-                ["bxexxe", "bxxexe", "exxexb", "exexxb", "eexexb", "eexbxx"],
-            ],
-            "SinglePiece_OpenBothEnds": [50, ["exee", "eeex"]],
-            "SinglePiece_OneOpenEnd": [40, ["bxe", "eexb"]],
-            "SinglePiece_OneOpenOneBlocked": [20, ["bxe"]],
-            "PotentialTwoInRow_OpenBothEnds": [10, ["exxe"]],
-            "PotentialSinglePiece_OneOpenEnd": [4, ["bxeee", "eeexb"]],
-        }
 
         def get_sequence_score(lines):
             """
             Tính giá trị heuristic dựa trên các pattern
             """
-            sequence_score = 0
-            for _, (value, patterns) in UTILITY.items():
-                for pattern in patterns:
-                    sequence_score += value * self.count_patterns_in_lines(
-                        lines, pattern
-                    )
-            return sequence_score
+            return self.scorer.score_lines(lines)
 
         def get_position_score(board, player):
             """
@@ -173,25 +273,54 @@ class Problem:
 
     def evaluate_move(self, move):
         """
-        Đánh giá nước đi
+        Đánh giá nước đi của AI: thực hiện nước đi, lấy giá trị đánh giá được
+        cập nhật dần rồi hoàn tác (không sao chép bàn cờ)
         """
         x, y = move
-        temp_board = self.board.board.copy()
-        temp_board[x][y] = self.ai_player
-        score = self.calculate_heuristic(temp_board, self.ai_player)
+        made = self.board.make_move(x, y, self.ai_player)
+        score = self.evaluate()
+        if made:
+            self.board.undo_move(x, y)
         return score
 
+    def evaluate_batch(self, boards):
+        """
+        Đánh giá nhiều bàn cờ (mảng số nguyên (n, size, size), xem batch.py)
+        theo góc nhìn của AI trong một lần tính vector hóa
+        """
+        return self.batch_evaluator.evaluate(boards, self.ai_player)
+
+    def evaluate_moves(self, moves, player=None):
+        """
+        Đánh giá (theo góc nhìn của AI) trạng thái sau mỗi nước đi trong moves
+        của player (mặc định là AI), tính cùng lúc cho mọi nước đi
+        """
+        player = player or self.ai_player
+        moves = list(moves)
+        boards = np.repeat(encode(self.board.board)[np.newaxis], len(moves), axis=0)
+        for i, (x, y) in enumerate(moves):
+            boards[i, x, y] = CODES[player]
+        return self.evaluate_batch(boards)
+
+    def get_candidate_moves(self):
+        """
+        Các nước đi cần xét khi tìm kiếm: ô trống gần các quân đã đặt.
+        Bàn cờ trống thì chỉ xét ô trung tâm
+        """
+        if self.candidates is None:
+            return self.get_valid_moves()
+        if not self.board.moves:
+            center = (self.board.size - 1) // 2
+            return [(center, center)]
+        moves = self.candidates.moves()
+        return moves if moves else self.get_valid_moves()
+
     def sort_moves(self):
         """
         Sắp xếp các nước đi tiềm năng dựa trên giá trị heuristic
         """
-        moves = []
         heuristic = self.HEURISTIC
-
-        empty_positions = np.argwhere(self.board.board == self.board.empty)
-        for x, y in empty_positions:
-            move_score = heuristic[x][y]
-            heapq.heappush(moves, (-move_score, x, y))
-
-        sorted_moves = [heapq.heappop(moves) for _ in range(len(moves))]
-        return [(x, y) for _, x, y in sorted_moves]
+        return sorted(
+            ((int(x), int(y)) for x, y in self.get_candidate_moves()),
+            key=lambda move: (-heuristic[move[0]][move[1]], move[0], move[1]),
+        )
@@ -0,0 +1,98 @@
+class PatternScorer:
+    """
+    Bộ đếm nhiều pattern cùng lúc bằng automaton Aho–Corasick.
+    Bảng UTILITY được dựng thành automaton một lần, mỗi đường chỉ cần quét
+    một lần để có số lần xuất hiện (kể cả chồng lấn) của mọi pattern.
+    Có thể dùng chung giữa các bộ đánh giá.
+    """
+
+    ALPHABET = "xeb"
+
+    def __init__(self, utility, max_cache=1 << 16):
+        """
+        utility: bảng {tên: [giá trị, [pattern, ...]]} như UTILITY
+        max_cache: số đường tối đa được ghi nhớ điểm
+        """
+        self.patterns = [
+            (name, value, pattern)
+            for name, (value, patterns) in utility.items()
+            for pattern in patterns
+        ]
+        self.max_cache = max_cache
+        self.cache = {}
+        self.build()
+
+    def build(self):
+        """
+        Dựng trie, liên kết thất bại và bảng chuyển trạng thái đầy đủ
+        """
+        goto = [{}]
+        outputs = [[]]
+        for index, (_, _, pattern) in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(index)
+
+        fail = [0] * len(goto)
+        queue = []
+        for char in self.ALPHABET:
+            if char in goto[0]:
+                queue.append(goto[0][char])
+            else:
+                goto[0][char] = 0
+        for state in queue:
+            for char in self.ALPHABET:
+                if char in goto[state]:
+                    child = goto[state][char]
+                    fail[child] = goto[fail[state]][char]
+                    outputs[child] = outputs[child] + outputs[fail[child]]
+                    queue.append(child)
+                else:
+                    goto[state][char] = goto[fail[state]][char]
+
+        self.transitions = goto
+        self.outputs = outputs
+        self.weights = [
+            sum(self.patterns[index][1] for index in output) for output in outputs
+        ]
+
+    def counts(self, line):
+        """
+        Số lần xuất hiện của từng pattern (theo thứ tự self.patterns) trong line
+        """
+        result = [0] * len(self.patterns)
+        state = 0
+        for char in line:
+            state = self.transitions[state][char]
+            for index in self.outputs[state]:
+                result[index] += 1
+        return result
+
+    def score(self, line):
+        """
+        Tổng điểm có trọng số của mọi pattern trong line
+        """
+        score = self.cache.get(line)
+        if score is None:
+            score = 0
+            state = 0
+            transitions = self.transitions
+            weights = self.weights
+            for char in line:
+                state = transitions[state][char]
+                score += weights[state]
+            if len(self.cache) >= self.max_cache:
+                self.cache.clear()
+            self.cache[line] = score
+        return score
+
+    def score_lines(self, lines):
+        """
+        Tổng điểm của nhiều đường
+        """
+        return sum(self.score(line) for line in lines)
@@ -1,62 +1,621 @@
+import math
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ordering import MoveOrdering
+from problem import Problem
+from stats import SearchStats
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+
+class SearchTimeout(Exception):
+    """
+    Hết thời gian cho phép của lượt đi
+    """
+
+
+def above(value):
+    """
+    Số thực nhỏ nhất lớn hơn value (cận trên của cửa sổ rỗng)
+    """
+    return math.nextafter(value, float("inf"))
+
+
+def below(value):
+    """
+    Số thực lớn nhất nhỏ hơn value (cận dưới của cửa sổ rỗng)
+    """
+    return math.nextafter(value, float("-inf"))
+
+
 class SearchStrategy:
     """
     Chiến lược tìm kiếm sử dụng thuật toán Alpha-Beta Pruning
     """
 
-    def __init__(self, max_depth=1):
+    def __init__(
+        self,
+        max_depth=1,
+        tt_size=None,
+        tt_replacement="depth",
+        time_limit_ms=None,
+        ordering=None,
+        workers=1,
+        algorithm="alphabeta",
+        aspiration=None,
+        threat_solver=None,
+        book=None,
+        symmetry=False,
+    ):
+        """
+        max_depth: độ sâu tìm kiếm
+        tt_size: số ô của bảng chuyển vị (None: không dùng bảng chuyển vị)
+        tt_replacement: chính sách thay thế của bảng chuyển vị
+        time_limit_ms: thời gian cho mỗi lượt đi (mili giây). Nếu có, dùng
+            iterative deepening và bỏ qua max_depth
+        ordering: bộ sắp xếp nước đi (MoveOrdering); None: dùng Problem.sort_moves
+        workers: số tiến trình tìm kiếm song song ở gốc (1: tìm kiếm tuần tự)
+        algorithm: "alphabeta" hoặc "pvs" (Principal Variation Search: các nước
+            sau nước đầu tiên được tìm với cửa sổ rỗng, chỉ tìm lại khi cần)
+        aspiration: độ rộng nửa cửa sổ aspiration quanh giá trị của lần lặp
+            trước khi dùng iterative deepening (None: không dùng)
+        threat_solver: bộ tìm chuỗi nước ép buộc (ThreatSolver) chạy trước
+            Alpha-Beta; None: không dùng
+        book: sổ khai cuộc (PositionBook) được tra trước khi tìm kiếm và lưu
+            kết quả tìm kiếm đủ sâu; None: không dùng
+        symmetry: nếu True, bỏ các nước đi ở gốc đối xứng với một nước đi
+            đứng trước qua phép đối xứng giữ nguyên bàn cờ
+        """
         self.max_depth = max_depth
+        self.depth_limit = max_depth
+        self.table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        self.time_limit_ms = time_limit_ms
+        self.deadline = None
+        # Sự kiện dừng từ luồng khác (threading.Event), ví dụ khi ponder
+        self.stop = None
+        self.ordering = ordering
+        self.stats = None
+        self.workers = workers
+        self.pool = None
+        self.shared_alpha = None
+        if algorithm not in ("alphabeta", "pvs"):
+            raise ValueError(f"Unknown search algorithm: {algorithm}")
+        self.pvs = algorithm == "pvs"
+        self.aspiration = aspiration
+        self.root_value = None
+        self.threat_solver = threat_solver
+        self.book = book
+        self.symmetry = symmetry
 
-    def alpha_beta_search(self, problem):
+    def alpha_beta_search(self, problem, stats=False):
         """
         Tìm kiếm nước đi tốt nhất cho AI sử dụng thuật toán Alpha-Beta Pruning
+        stats: nếu True, trả về (nước đi, SearchStats)
         """
+        self.stats = SearchStats() if stats else None
+        if self.ordering is not None:
+            self.ordering.new_search()
+        if self.time_limit_ms is not None:
+            self.deadline = time.monotonic() + self.time_limit_ms / 1000
+        try:
+            best_move = self.choose_move(problem)
+        finally:
+            self.deadline = None
 
-        def max_value(problem, alpha, beta, depth):
-            if problem.is_game_over() or depth >= self.max_depth:
-                return problem.evaluate()
+        if not stats:
+            return best_move
+        result, self.stats = self.stats, None
+        result.pv = (
+            result.depths[-1]["pv"] if result.depths else result.pv_table.get(-1, [])
+        )
+        result.finish()
+        return best_move, result
 
-            value = float("-inf")
-            for move in problem.sort_moves():
-                problem.board.make_move(*move, problem.ai_player)
-                value = max(value, min_value(problem, alpha, beta, depth + 1))
-                problem.board.undo_move(*move)
+    def choose_move(self, problem):
+        """
+        Nước đi từ sổ khai cuộc, bộ tìm chuỗi ép buộc hoặc tìm kiếm Alpha-Beta.
+        Với giới hạn thời gian, thời gian của bộ tìm chuỗi ép buộc được tính
+        vào cùng thời hạn self.deadline
+        """
+        entry = self.probe_book(problem)
+        threat = None
+        if entry is None and self.threat_solver is not None:
+            threat = self.threat_solver.solve(problem, self.time_up)
+        if entry is not None:
+            best_move = entry[0]
+            if self.stats is not None:
+                self.stats.book = True
+                self.stats.pv_table[-1] = [best_move]
+        elif threat is not None:
+            best_move, kind = threat
+            if self.stats is not None:
+                self.stats.threat = kind
+                self.stats.pv_table[-1] = [best_move]
+        elif self.time_limit_ms is not None:
+            best_move = self.iterative_deepening(problem)
+            self.store_book(problem, best_move, self.depth_limit - 1)
+        else:
+            self.depth_limit = self.max_depth
+            best_move = self.search_root(problem)
+            self.store_book(problem, best_move, self.max_depth)
+        return best_move
 
-                if value >= beta:
-                    return value
-                alpha = max(alpha, value)
+    def probe_book(self, problem):
+        """
+        Tra sổ khai cuộc: với độ sâu cố định chỉ dùng mục được tìm ít nhất
+        cùng độ sâu, với giới hạn thời gian dùng mọi mục
+        """
+        if self.book is None:
+            return None
+        min_depth = self.max_depth if self.time_limit_ms is None else 0
+        return self.book.probe(problem, problem.ai_player, min_depth)
 
-            return value
+    def store_book(self, problem, move, depth):
+        """
+        Lưu kết quả tìm kiếm ở gốc vào sổ khai cuộc (nếu có)
+        """
+        if self.book is not None and self.root_value is not None:
+            self.book.store(problem, problem.ai_player, move, depth, self.root_value)
 
-        def min_value(problem, alpha, beta, depth):
-            if problem.is_game_over() or depth >= self.max_depth:
-                return problem.evaluate()
+    def iterative_deepening(self, problem):
+        """
+        Tìm kiếm với độ sâu tăng dần 0, 1, 2, ... cho đến khi hết thời gian
+        (self.deadline, đặt bởi alpha_beta_search).
+        Nước đi tốt nhất của lần lặp trước được xét đầu tiên ở lần lặp sau.
+        Trả về nước đi tốt nhất của lần lặp cuối cùng đã hoàn thành
+        """
+        board = problem.board
+        root_moves = len(board.moves)
+        empty_cells = board.size * board.size - root_moves
 
-            value = float("inf")
-            for move in problem.sort_moves():
-                problem.board.make_move(*move, problem.human_player)
-                value = min(value, max_value(problem, alpha, beta, depth + 1))
-                problem.board.undo_move(*move)
+        best_move = None
+        self.depth_limit = 0
+        try:
+            while self.depth_limit < empty_cells:
+                best_move = self.search_aspiration(problem, best_move)
+                if self.stats is not None:
+                    self.stats.add_depth(self.depth_limit, best_move)
+                self.depth_limit += 1
+        except SearchTimeout:
+            while len(board.moves) > root_moves:
+                board.undo_move(*board.last_move)
 
-                if value <= alpha:
-                    return value
-                beta = min(beta, value)
+        if best_move is None:
+            moves = problem.sort_moves()
+            best_move = moves[0] if moves else None
+        return best_move
 
-            return value
+    def search_aspiration(self, problem, first_move):
+        """
+        Tìm kiếm từ gốc với cửa sổ aspiration quanh giá trị của lần lặp trước;
+        nếu kết quả rơi ra ngoài cửa sổ thì tìm lại với cửa sổ đầy đủ
+        """
+        previous = self.root_value
+        if self.aspiration is None or first_move is None or previous is None:
+            return self.search_root(problem, first_move)
+        alpha, beta = previous - self.aspiration, previous + self.aspiration
+        best_move = self.search_root(problem, first_move, alpha, beta)
+        if alpha < self.root_value < beta:
+            return best_move
+        return self.search_root(problem, first_move)
 
+    def check_time(self):
+        """
+        Dừng tìm kiếm nếu đã hết thời gian hoặc được yêu cầu dừng
+        """
+        if self.time_up():
+            raise SearchTimeout()
+
+    def time_up(self):
+        """
+        Đã hết thời gian hoặc được yêu cầu dừng chưa
+        """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.stop is not None and self.stop.is_set()
+
+    def search_root(
+        self, problem, first_move=None, alpha=float("-inf"), beta=float("inf")
+    ):
+        """
+        Tìm kiếm từ gốc với độ sâu self.depth_limit trong cửa sổ (alpha, beta).
+        first_move: nước đi được xét đầu tiên (nếu không có trong bảng chuyển vị)
+        Giá trị của gốc được lưu ở self.root_value
+        """
         best_move = None
         best_value = float("-inf")
-        alpha = float("-inf")
-        beta = float("inf")
+        alpha_orig, beta_orig = alpha, beta
 
-        for move in problem.sort_moves():
+        tt_move = first_move
+        if self.table is not None:
+            key = problem.hash_board() ^ problem.zobrist.side_key
+            entry = self.table.lookup(key)
+            if entry is not None and tt_move is None:
+                tt_move = entry.move
+
+        moves = self.ordered_moves(problem, problem.ai_player, 0, tt_move)
+        if self.symmetry:
+            moves = problem.symmetry.unique_moves(moves)
+        if self.workers > 1 and len(moves) > 1 and alpha_orig == float("-inf"):
+            best_move, best_value = self.parallel_root(problem, moves)
+            moves = []
+
+        for index, move in enumerate(moves):
             problem.board.make_move(*move, problem.ai_player)
-            value = min_value(problem, alpha, beta, 0)
+            if self.pvs and index > 0:
+                value = self.min_value(problem, alpha, above(alpha), 0)
+                if alpha < value < beta:
+                    value = self.min_value(problem, alpha, beta, 0)
+            else:
+                value = self.min_value(problem, alpha, beta, 0)
             problem.board.undo_move(*move)
 
             if value > best_value:
                 best_value = value
                 best_move = move
-                # print(f"Move: {move}, Value: {value}")
+                if self.stats is not None:
+                    self.stats.update_pv(-1, move)
+            if best_value >= beta:
+                break
             alpha = max(alpha, best_value)
 
+        self.root_value = best_value
+        if self.table is not None and best_move is not None:
+            self.record(key, -1, best_value, alpha_orig, beta_orig, best_move)
+
         return best_move
+
+    def parallel_root(self, problem, moves):
+        """
+        Tìm kiếm song song ở gốc (Young Brothers Wait):
+        nước đi đầu tiên được tìm tuần tự để có alpha, các nước còn lại được
+        chia cho các tiến trình với alpha dùng chung.
+        Trả về (best_move, best_value) giống tìm kiếm tuần tự cùng độ sâu
+        """
+        first = moves[0]
+        problem.board.make_move(*first, problem.ai_player)
+        best_value = self.min_value(problem, float("-inf"), float("inf"), 0)
+        problem.board.undo_move(*first)
+
+        pool = self.get_pool()
+        self.shared_alpha.value = best_value
+        snapshot = problem.snapshot()
+        options = self.worker_options()
+        stats = self.stats
+        pvs = {0: stats.pv_table.get(0, []) if stats is not None else []}
+        futures = {
+            pool.submit(
+                search_root_move,
+                snapshot,
+                options,
+                move,
+                best_value,
+                self.depth_limit,
+                self.deadline,
+                stats is not None,
+            ): index
+            for index, move in enumerate(moves[1:], 1)
+        }
+        results = {0: (best_value, True)}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    value, alpha, worker_stats = future.result()
+                    index = futures[future]
+                    results[index] = (value, value > alpha)
+                    if stats is not None:
+                        stats.merge(worker_stats)
+                        pvs[index] = worker_stats["pv"]
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+        # Chọn nước đi đầu tiên (theo thứ tự) đạt giá trị lớn nhất như tìm kiếm
+        # tuần tự. Giá trị không vượt alpha chỉ là cận trên, nếu bằng giá trị
+        # lớn nhất thì phải tìm lại với cửa sổ hạ thấp để biết có bằng thật không
+        best_value = max(value for value, _ in results.values())
+        lower = below(best_value)
+        for index, move in enumerate(moves):
+            value, exact = results[index]
+            if value != best_value:
+                continue
+            if not exact:
+                problem.board.make_move(*move, problem.ai_player)
+                value = self.min_value(problem, lower, float("inf"), 0)
+                problem.board.undo_move(*move)
+                if value <= lower:
+                    continue
+            if stats is not None:
+                stats.pv_table[-1] = [move] + pvs.get(index, [])
+            return move, best_value
+        return moves[0], best_value
+
+    def get_pool(self):
+        """
+        Tạo (một lần) pool tiến trình và biến alpha dùng chung
+        """
+        if self.pool is None:
+            self.shared_alpha = multiprocessing.Value("d", float("-inf"))
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.shared_alpha,),
+            )
+        return self.pool
+
+    def worker_options(self):
+        """
+        Cấu hình để tạo SearchStrategy tương ứng trong tiến trình con
+        """
+        ordering = None
+        if self.ordering is not None:
+            ordering = dict(
+                threat=self.ordering.use_threat,
+                killers=self.ordering.use_killers,
+                history=self.ordering.use_history,
+                killer_slots=self.ordering.killer_slots,
+                threat_min_depth=self.ordering.threat_min_depth,
+            )
+        return dict(
+            algorithm="pvs" if self.pvs else "alphabeta",
+            tt_size=self.table.size if self.table is not None else None,
+            tt_replacement=self.table.replace if self.table is not None else None,
+            ordering=ordering,
+        )
+
+    def close(self):
+        """
+        Đóng pool tiến trình (nếu có)
+        """
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+            self.shared_alpha = None
+
+    def ordered_moves(self, problem, player, ply, tt_move=None):
+        """
+        Các nước đi của player tại tầng ply đã được sắp xếp.
+        Nước đi tốt nhất từ bảng chuyển vị (nếu có) được xét trước
+        """
+        if self.stats is not None:
+            start = time.perf_counter()
+            moves = self.sort_moves(problem, player, ply, tt_move)
+            self.stats.time_sort_moves += time.perf_counter() - start
+            return moves
+        return self.sort_moves(problem, player, ply, tt_move)
+
+    def sort_moves(self, problem, player, ply, tt_move):
+        """
+        Sắp xếp nước đi bằng bộ sắp xếp (nếu có) hoặc Problem.sort_moves
+        """
+        if self.ordering is not None:
+            remaining = self.depth_limit - ply + 1
+            return self.ordering.order(problem, player, ply, tt_move, remaining)
+        moves = problem.sort_moves()
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def on_cutoff(self, player, move, depth):
+        """
+        Báo cho bộ sắp xếp nước đi về một lần cắt tỉa tại độ sâu depth
+        """
+        if self.ordering is not None:
+            self.ordering.cutoff(player, move, depth + 1, self.depth_limit - depth)
+        if self.stats is not None:
+            self.stats.add_cutoff(depth + 1)
+
+    def probe(self, key, alpha, beta, depth):
+        """
+        Tra bảng chuyển vị.
+        Trả về (value, alpha, beta, tt_move); value khác None nếu có thể cắt tỉa
+        """
+        entry = self.table.lookup(key)
+        stats = self.stats
+        if stats is not None:
+            stats.tt_probes += 1
+        if entry is None:
+            return None, alpha, beta, None
+        if stats is not None:
+            stats.tt_hits += 1
+        value = None
+        if entry.depth >= self.depth_limit - depth:
+            if entry.flag == EXACT:
+                value = entry.value
+            else:
+                if entry.flag == LOWER:
+                    alpha = max(alpha, entry.value)
+                else:
+                    beta = min(beta, entry.value)
+                if alpha >= beta:
+                    value = entry.value
+        if value is not None and stats is not None:
+            stats.tt_cutoffs += 1
+            stats.pv_table[depth] = [entry.move] if entry.move is not None else []
+        return value, alpha, beta, entry.move
+
+    def record(self, key, depth, value, alpha, beta, move):
+        """
+        Lưu kết quả của một nút vào bảng chuyển vị cùng loại cận
+        """
+        if value <= alpha:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, self.depth_limit - depth, value, flag, move)
+
+    def leaf_value(self, problem, depth):
+        """
+        Giá trị đánh giá nếu nút ở độ sâu depth là nút lá, ngược lại None
+        """
+        stats = self.stats
+        if stats is None:
+            if problem.is_game_over() or depth >= self.depth_limit:
+                return problem.evaluate()
+            self.check_time()
+            return None
+
+        start = time.perf_counter()
+        game_over = problem.is_game_over()
+        stats.time_game_over += time.perf_counter() - start
+        if game_over or depth >= self.depth_limit:
+            start = time.perf_counter()
+            value = problem.evaluate()
+            stats.time_evaluate += time.perf_counter() - start
+            stats.leaves += 1
+            stats.pv_table[depth] = []
+            return value
+        self.check_time()
+        stats.nodes += 1
+        return None
+
+    def max_value(self, problem, alpha, beta, depth):
+        """
+        Lượt của AI: chọn giá trị lớn nhất
+        """
+        leaf = self.leaf_value(problem, depth)
+        if leaf is not None:
+            return leaf
+
+        tt_move = None
+        if self.table is not None:
+            key = problem.hash_board() ^ problem.zobrist.side_key
+            value, alpha, beta, tt_move = self.probe(key, alpha, beta, depth)
+            if value is not None:
+                return value
+        alpha_orig, beta_orig = alpha, beta
+
+        value = float("-inf")
+        best_move = None
+        player = problem.ai_player
+        moves = self.ordered_moves(problem, player, depth + 1, tt_move)
+        for index, move in enumerate(moves):
+            problem.board.make_move(*move, player)
+            if self.pvs and index > 0:
+                child = self.min_value(problem, alpha, above(alpha), depth + 1)
+                if alpha < child < beta:
+                    child = self.min_value(problem, alpha, beta, depth + 1)
+            else:
+                child = self.min_value(problem, alpha, beta, depth + 1)
+            problem.board.undo_move(*move)
+
+            if child > value:
+                value = child
+                best_move = move
+                if self.stats is not None:
+                    self.stats.update_pv(depth, move)
+            if value >= beta:
+                self.on_cutoff(player, move, depth)
+                break
+            alpha = max(alpha, value)
+
+        if self.table is not None:
+            self.record(key, depth, value, alpha_orig, beta_orig, best_move)
+        return value
+
+    def min_value(self, problem, alpha, beta, depth):
+        """
+        Lượt của người chơi: chọn giá trị nhỏ nhất
+        """
+        leaf = self.leaf_value(problem, depth)
+        if leaf is not None:
+            return leaf
+
+        tt_move = None
+        if self.table is not None:
+            key = problem.hash_board()
+            value, alpha, beta, tt_move = self.probe(key, alpha, beta, depth)
+            if value is not None:
+                return value
+        alpha_orig, beta_orig = alpha, beta
+
+        value = float("inf")
+        best_move = None
+        player = problem.human_player
+        moves = self.ordered_moves(problem, player, depth + 1, tt_move)
+        for index, move in enumerate(moves):
+            problem.board.make_move(*move, player)
+            if self.pvs and index > 0:
+                child = self.max_value(problem, below(beta), beta, depth + 1)
+                if alpha < child < beta:
+                    child = self.max_value(problem, alpha, beta, depth + 1)
+            else:
+                child = self.max_value(problem, alpha, beta, depth + 1)
+            problem.board.undo_move(*move)
+
+            if child < value:
+                value = child
+                best_move = move
+                if self.stats is not None:
+                    self.stats.update_pv(depth, move)
+            if value <= alpha:
+                self.on_cutoff(player, move, depth)
+                break
+            beta = min(beta, value)
+
+        if self.table is not None:
+            self.record(key, depth, value, alpha_orig, beta_orig, best_move)
+        return value
+
+
+# Trạng thái của tiến trình con khi tìm kiếm song song
+worker_state = {}
+
+
+def init_worker(shared_alpha):
+    """
+    Khởi tạo tiến trình con với alpha dùng chung
+    """
+    worker_state["alpha"] = shared_alpha
+
+
+def search_root_move(snapshot, options, move, alpha, depth_limit, deadline, stats):
+    """
+    Tìm kiếm một nước đi ở gốc trong tiến trình con.
+    Problem và SearchStrategy được giữ lại giữa các lần gọi.
+    Trả về (value, alpha đã dùng, thống kê dạng dict hoặc None)
+    """
+    problem_options, moves = snapshot
+    problem = worker_state.get("problem")
+    if problem is None or problem.options != problem_options:
+        problem = worker_state["problem"] = Problem(**problem_options)
+    problem.load_moves(moves)
+
+    strategy = worker_state.get("strategy")
+    if strategy is None or worker_state.get("options") != options:
+        ordering = options["ordering"]
+        strategy = worker_state["strategy"] = SearchStrategy(
+            algorithm=options["algorithm"],
+            tt_size=options["tt_size"],
+            tt_replacement=options["tt_replacement"],
+            ordering=MoveOrdering(**ordering) if ordering is not None else None,
+        )
+        worker_state["options"] = options
+    strategy.depth_limit = depth_limit
+    strategy.deadline = deadline
+    strategy.stats = SearchStats() if stats else None
+    if strategy.ordering is not None:
+        strategy.ordering.new_search()
+
+    shared_alpha = worker_state["alpha"]
+    alpha = max(alpha, shared_alpha.value)
+    problem.board.make_move(*move, problem.ai_player)
+    value = strategy.min_value(problem, alpha, float("inf"), 0)
+    problem.board.undo_move(*move)
+    with shared_alpha.get_lock():
+        if value > shared_alpha.value:
+            shared_alpha.value = value
+
+    if strategy.stats is None:
+        return value, alpha, None
+    result = strategy.stats.as_dict()
+    result["pv"] = strategy.stats.pv_table.get(0, [])
+    strategy.stats = None
+    return value, alpha, result
@@ -0,0 +1,438 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from inspect import signature
+
+import numpy as np
+from bitboard import BitBoard
+from match import build_strategy
+from ordering import MoveOrdering
+from problem import Problem
+from search import SearchStrategy
+from threats import ThreatSolver
+
+# Problem được giữ lại trong tiến trình con giữa các lần tìm kiếm
+worker_state = {}
+
+
+def search_move(snapshot, config, time_limit_ms):
+    """
+    Tìm nước đi cho AI trong tiến trình con với giới hạn thời gian.
+    Trả về (move, thông tin tìm kiếm dạng dict)
+    """
+    options, moves = snapshot
+    problem = worker_state.get("problem")
+    if problem is None or problem.options != options:
+        problem = worker_state["problem"] = Problem(**options)
+    problem.load_moves(moves)
+
+    strategy = build_strategy(dict(config, time_limit_ms=time_limit_ms))
+    try:
+        move, stats = strategy.alpha_beta_search(problem, stats=True)
+    finally:
+        strategy.close()
+    return (int(move[0]), int(move[1])), dict(
+        depth=stats.depths[-1]["depth"] if stats.depths else None,
+        nodes=stats.nodes + stats.leaves,
+        search_ms=stats.elapsed * 1e3,
+        book=stats.book,
+        threat=stats.threat,
+    )
+
+
+def check_config(config):
+    """
+    Kiểm tra tên các tham số của cấu hình tìm kiếm (dạng match.build_strategy)
+    để cấu hình sai bị báo lỗi ngay khi tạo ván, không phải ở lượt đi của AI
+    """
+    if not isinstance(config, dict):
+        raise ValueError("config must be an object")
+    for key, options, cls in (
+        ("config", config, SearchStrategy),
+        ("ordering", config.get("ordering"), MoveOrdering),
+        ("threat_solver", config.get("threat_solver"), ThreatSolver),
+    ):
+        if not isinstance(options, dict):
+            continue
+        allowed = set(signature(cls).parameters) | (
+            {"name"} if cls is SearchStrategy else set()
+        )
+        unknown = sorted(set(options) - allowed)
+        if unknown:
+            raise ValueError(f"unknown {key} options: {', '.join(unknown)}")
+
+
+def get_cell(request):
+    """
+    Ô (x, y) của yêu cầu, x và y phải là số nguyên
+    """
+    x, y = request.get("x"), request.get("y")
+    if any(isinstance(v, bool) or not isinstance(v, int) for v in (x, y)):
+        raise ValueError("x and y must be integers")
+    return x, y
+
+
+class GameSession:
+    """
+    Một ván đang chơi trên server: Problem theo góc nhìn của AI, cấu hình
+    tìm kiếm, thời gian còn lại của AI và khóa để xử lý lần lượt các yêu cầu
+    """
+
+    def __init__(self, game_id, problem, config, budget_ms):
+        self.game_id = game_id
+        self.problem = problem
+        self.config = config
+        self.budget_ms = budget_ms
+        self.lock = asyncio.Lock()
+
+    def state(self):
+        """
+        Trạng thái của ván dưới dạng dict (để trả về cho client)
+        """
+        problem = self.problem
+        winner = None
+        for player in (problem.human_player, problem.ai_player):
+            if problem.check_winner(player):
+                winner = player
+        return dict(
+            game=self.game_id,
+            moves=[
+                (x, y, str(problem.board.player_at(x, y)))
+                for x, y in problem.board.moves
+            ],
+            to_move=problem.current_player,
+            winner=winner,
+            over=problem.is_game_over(),
+            budget_ms=self.budget_ms,
+        )
+
+
+class GameServer:
+    """
+    Dịch vụ chơi nhiều ván cùng lúc theo giao thức JSON lines.
+    Các ván được giữ trong bộ nhớ, lượt đi của AI được gửi sang pool tiến
+    trình nên vòng lặp sự kiện không bị chặn. Số lượt AI đang chờ bị giới
+    hạn (quá giới hạn thì trả lỗi "busy"), mỗi ván có quỹ thời gian riêng
+    """
+
+    def __init__(
+        self,
+        workers=2,
+        max_queue=64,
+        move_time_ms=1000,
+        budget_ms=None,
+        min_move_ms=20,
+        config=None,
+    ):
+        """
+        workers: số tiến trình tìm kiếm
+        max_queue: số lượt AI tối đa đang chờ hoặc đang tìm
+        move_time_ms: thời gian tối đa cho một nước đi của AI
+        budget_ms: quỹ thời gian mặc định của AI cho cả ván (None: không giới hạn)
+        min_move_ms: thời gian tối thiểu cho một nước đi khi quỹ sắp hết
+        config: cấu hình SearchStrategy mặc định (như match.build_strategy)
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.move_time_ms = move_time_ms
+        self.budget_ms = budget_ms
+        self.min_move_ms = min_move_ms
+        self.config = config or {}
+        check_config(self.config)
+        self.pool = None
+        self.slots = None
+        self.pending = 0
+        self.games = {}
+        self.ids = itertools.count(1)
+        self.latencies = deque(maxlen=10000)
+        self.search_times = deque(maxlen=10000)
+        self.rejected = 0
+
+    def start(self):
+        """
+        Tạo pool tiến trình (gọi trong vòng lặp sự kiện)
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.slots = asyncio.Semaphore(self.workers)
+
+    def close(self):
+        """
+        Đóng pool tiến trình
+        """
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def move_time(self, session):
+        """
+        Thời gian cho nước đi tiếp theo của AI: không quá move_time_ms và không
+        quá 1/10 quỹ thời gian còn lại của ván
+        """
+        if session.budget_ms is None:
+            return self.move_time_ms
+        return max(self.min_move_ms, min(self.move_time_ms, session.budget_ms / 10))
+
+    def check_queue(self):
+        """
+        Từ chối yêu cầu mới nếu đã có max_queue lượt AI đang chờ hoặc đang tìm.
+        Gọi trước khi thay đổi ván để client có thể gửi lại yêu cầu
+        """
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise RuntimeError("busy")
+
+    async def ai_move(self, session):
+        """
+        Gửi lượt đi của AI sang pool tiến trình và áp dụng nước đi vào ván
+        """
+        problem = session.problem
+        time_limit_ms = self.move_time(session)
+        start = time.perf_counter()
+        self.pending += 1
+        try:
+            async with self.slots:
+                loop = asyncio.get_running_loop()
+                move, info = await loop.run_in_executor(
+                    self.pool,
+                    search_move,
+                    problem.snapshot(),
+                    session.config,
+                    time_limit_ms,
+                )
+        finally:
+            self.pending -= 1
+        latency_ms = (time.perf_counter() - start) * 1e3
+        self.latencies.append(latency_ms)
+        self.search_times.append(info["search_ms"])
+        if session.budget_ms is not None:
+            session.budget_ms = max(0.0, session.budget_ms - info["search_ms"])
+
+        problem.board.make_move(*move, problem.ai_player)
+        problem.switch_player()
+        return dict(info, move=move, latency_ms=latency_ms, time_limit_ms=time_limit_ms)
+
+    def get_session(self, request):
+        """
+        Ván có mã request["game"]
+        """
+        session = self.games.get(request.get("game"))
+        if session is None:
+            raise KeyError(f"unknown game {request.get('game')}")
+        return session
+
+    async def new_game(self, request):
+        """
+        {"op": "new", "size", "win_length", "human_player", "ai_starts",
+        "budget_ms", "config"}: tạo ván mới (AI đi trước nếu ai_starts)
+        """
+        human_player = request.get("human_player", "X")
+        if human_player not in ("X", "O"):
+            raise ValueError("human_player must be X or O")
+        config = request.get("config", {})
+        check_config(config)
+        if request.get("ai_starts"):
+            self.check_queue()
+        problem = Problem(
+            request.get("size", 8),
+            human_player=human_player,
+            win_length=request.get("win_length", 4),
+            board_class=BitBoard,
+        )
+        session = GameSession(
+            next(self.ids),
+            problem,
+            dict(self.config, **config),
+            request.get("budget_ms", self.budget_ms),
+        )
+        response = {}
+        if request.get("ai_starts"):
+            problem.current_player = problem.ai_player
+            async with session.lock:
+                response["ai"] = await self.ai_move(session)
+        self.games[session.game_id] = session
+        return dict(response, **session.state())
+
+    async def play(self, request):
+        """
+        {"op": "move", "game", "x", "y"}: nước đi của người chơi, sau đó AI đi.
+        Nếu lượt của AI lỗi thì nước đi của người chơi được hoàn tác để có thể
+        gửi lại yêu cầu
+        """
+        session = self.get_session(request)
+        problem = session.problem
+        x, y = get_cell(request)
+        async with session.lock:
+            if problem.is_game_over():
+                raise ValueError("game is over")
+            if problem.current_player != problem.human_player:
+                raise ValueError("not your turn")
+            self.check_queue()
+            if not problem.board.make_move(x, y, problem.human_player):
+                raise ValueError("invalid move")
+            problem.switch_player()
+            response = {}
+            if not problem.is_game_over():
+                try:
+                    response["ai"] = await self.ai_move(session)
+                except BaseException:
+                    problem.board.undo_move(x, y)
+                    problem.switch_player()
+                    raise
+            return dict(response, **session.state())
+
+    async def handle(self, request):
+        """
+        Xử lý một yêu cầu, trả về dict kết quả (có "error" nếu lỗi)
+        """
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            op = request.get("op")
+            if op == "new":
+                response = await self.new_game(request)
+            elif op == "move":
+                response = await self.play(request)
+            elif op == "state":
+                response = self.get_session(request).state()
+            elif op == "close":
+                self.games.pop(self.get_session(request).game_id)
+                response = dict(game=request["game"], closed=True)
+            elif op == "stats":
+                response = self.stats()
+            else:
+                raise ValueError(f"unknown op {op!r}")
+        except (KeyError, ValueError, RuntimeError) as error:
+            message = error.args[0] if error.args else str(error)
+            response = dict(error=str(message))
+        except Exception as error:
+            response = dict(error=f"{type(error).__name__}: {error}")
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def stats(self):
+        """
+        Thống kê của server: số ván, số lượt đang chờ, số yêu cầu bị từ chối
+        và phân vị độ trễ (gồm thời gian chờ) và thời gian tìm kiếm mỗi nước đi
+        """
+
+        def percentiles(values):
+            if not values:
+                return None
+            p50, p90, p99 = np.percentile(list(values), [50, 90, 99])
+            return dict(p50=p50, p90=p90, p99=p99, max=max(values))
+
+        return dict(
+            games=len(self.games),
+            pending=self.pending,
+            rejected=self.rejected,
+            moves=len(self.latencies),
+            latency_ms=percentiles(self.latencies),
+            search_ms=percentiles(self.search_times),
+        )
+
+    async def serve_lines(self, reader, write):
+        """
+        Đọc yêu cầu JSON từng dòng từ reader, xử lý đồng thời và ghi kết quả
+        (mỗi kết quả một dòng, kèm "id" của yêu cầu nếu có) bằng write
+        """
+        tasks = set()
+
+        async def respond(line):
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                write(dict(error=f"invalid JSON: {error}"))
+                return
+            write(await self.handle(request))
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def serve_tcp(self, host, port):
+        """
+        Phục vụ qua TCP, mỗi kết nối là một luồng JSON lines
+        """
+        self.start()
+
+        async def client(reader, writer):
+            def write(response):
+                writer.write((json.dumps(response) + "\n").encode())
+
+            try:
+                await self.serve_lines(reader, write)
+                await writer.drain()
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(client, host, port)
+        print(f"serving on {host}:{port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self):
+        """
+        Phục vụ qua stdin/stdout (JSON lines), dừng khi stdin kết thúc
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+
+        def write(response):
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+        await self.serve_lines(reader, write)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe JSON-lines game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stdio", action="store_true", help="serve stdin/stdout")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--move-time-ms", type=float, default=1000)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument(
+        "--config", default="{}", help="JSON config of the search strategy"
+    )
+    args = parser.parse_args()
+
+    server = GameServer(
+        workers=args.workers,
+        max_queue=args.max_queue,
+        move_time_ms=args.move_time_ms,
+        budget_ms=args.budget_ms,
+        config=json.loads(args.config),
+    )
+    try:
+        if args.stdio:
+            asyncio.run(server.serve_stdio())
+        else:
+            asyncio.run(server.serve_tcp(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
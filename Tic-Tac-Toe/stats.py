@@ -0,0 +1,108 @@
+import time
+
+
+class SearchStats:
+    """
+    Thống kê của một lượt tìm kiếm: số nút, số lần đánh giá, số lần cắt tỉa
+    theo tầng, số lần trúng bảng chuyển vị, thời gian của từng phần,
+    số nút mỗi giây, biến thể chính (principal variation), loại nước ép
+    buộc nếu nước đi được tìm bởi ThreatSolver và nước đi có lấy từ sổ khai
+    cuộc hay không
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = {}
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.time_evaluate = 0.0
+        self.time_game_over = 0.0
+        self.time_sort_moves = 0.0
+        self.elapsed = 0.0
+        self.depths = []
+        self.pv = []
+        self.pv_table = {}
+        self.threat = None
+        self.book = False
+        self.start = time.perf_counter()
+
+    def finish(self):
+        """
+        Ghi nhận tổng thời gian tìm kiếm
+        """
+        self.elapsed = time.perf_counter() - self.start
+
+    def add_depth(self, depth, best_move):
+        """
+        Ghi nhận một lần lặp của iterative deepening đã hoàn thành
+        """
+        self.depths.append(
+            dict(
+                depth=depth,
+                time=time.perf_counter() - self.start,
+                nodes=self.nodes + self.leaves,
+                best_move=best_move,
+                pv=list(self.pv_table.get(-1, [])),
+            )
+        )
+
+    def add_cutoff(self, ply):
+        """
+        Ghi nhận một lần cắt tỉa tại tầng ply
+        """
+        self.cutoffs[ply] = self.cutoffs.get(ply, 0) + 1
+
+    def update_pv(self, depth, move):
+        """
+        Cập nhật biến thể chính của nút ở độ sâu depth khi tìm được nước tốt hơn
+        """
+        self.pv_table[depth] = [move] + self.pv_table.get(depth + 1, [])
+
+    def merge(self, other):
+        """
+        Cộng dồn thống kê (dạng dict) từ tiến trình con
+        """
+        for name in (
+            "nodes",
+            "leaves",
+            "tt_probes",
+            "tt_hits",
+            "tt_cutoffs",
+            "time_evaluate",
+            "time_game_over",
+            "time_sort_moves",
+        ):
+            setattr(self, name, getattr(self, name) + other[name])
+        for ply, count in other["cutoffs"].items():
+            self.cutoffs[ply] = self.cutoffs.get(ply, 0) + count
+
+    @property
+    def nps(self):
+        """
+        Số nút (kể cả nút lá) mỗi giây
+        """
+        return (self.nodes + self.leaves) / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        """
+        Thống kê dưới dạng dict (dùng để in hoặc ghi log)
+        """
+        return dict(
+            nodes=self.nodes,
+            leaves=self.leaves,
+            cutoffs=dict(sorted(self.cutoffs.items())),
+            tt_probes=self.tt_probes,
+            tt_hits=self.tt_hits,
+            tt_cutoffs=self.tt_cutoffs,
+            time_evaluate=self.time_evaluate,
+            time_game_over=self.time_game_over,
+            time_sort_moves=self.time_sort_moves,
+            elapsed=self.elapsed,
+            nps=self.nps,
+            depths=self.depths,
+            pv=[(int(x), int(y)) for x, y in self.pv],
+            threat=self.threat,
+            book=self.book,
+        )
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from operator import xor
+
+# 8 phép đối xứng của bàn cờ vuông: 4 phép quay (0, 90, 180, 270 độ) và
+# 4 phép quay sau khi lật qua đường chéo chính
+SYMMETRIES = 8
+
+
+def transform_cell(x, y, size, t):
+    """
+    Ảnh của ô (x, y) qua phép đối xứng thứ t (0 <= t < 8, t = 0 là đồng nhất)
+    """
+    if t >= 4:
+        x, y = y, x
+    for _ in range(t % 4):
+        x, y = y, size - 1 - x
+    return x, y
+
+
+@lru_cache(maxsize=None)
+def symmetry_table(size):
+    """
+    Bảng đối xứng của bàn cờ size x size (tính một lần cho mỗi kích thước).
+    Trả về (maps, inverse):
+        maps: với mỗi phép đối xứng t, tuple ảnh của từng ô x * size + y
+        inverse: inverse[t] là phép đối xứng ngược của t
+    """
+    maps = []
+    for t in range(SYMMETRIES):
+        image = []
+        for x in range(size):
+            for y in range(size):
+                i, j = transform_cell(x, y, size, t)
+                image.append(i * size + j)
+        maps.append(tuple(image))
+
+    identity = tuple(range(size * size))
+    inverse = []
+    for t in range(SYMMETRIES):
+        for u in range(SYMMETRIES):
+            if tuple(maps[u][cell] for cell in maps[t]) == identity:
+                inverse.append(u)
+                break
+    return tuple(maps), tuple(inverse)
+
+
+def transform_move(move, size, t):
+    """
+    Ảnh của nước đi (x, y) qua phép đối xứng t
+    """
+    maps, _ = symmetry_table(size)
+    cell = maps[t][move[0] * size + move[1]]
+    return cell // size, cell % size
+
+
+def restore_move(move, size, t):
+    """
+    Nước đi trên bàn cờ gốc ứng với nước đi move trên bàn cờ đã biến đổi bởi t
+    """
+    _, inverse = symmetry_table(size)
+    return transform_move(move, size, inverse[t])
+
+
+class SymmetryHash:
+    """
+    8 hash Zobrist của 8 ảnh đối xứng của bàn cờ, cập nhật dần sau mỗi nước
+    đi/hoàn tác bằng XOR giống ZobristHash. Dùng để lấy hash chính tắc (gộp các
+    thế cờ đối xứng) và tìm các phép đối xứng giữ nguyên bàn cờ hiện tại
+    """
+
+    def __init__(self, board, zobrist):
+        """
+        Dùng chung khóa ngẫu nhiên với zobrist nên values[0] == zobrist.value
+        """
+        self.size = board.size
+        self.maps, _ = symmetry_table(board.size)
+        # keys[player][cell]: khóa của ảnh của ô cell qua 8 phép đối xứng
+        self.keys = {
+            player: [
+                tuple(keys[image[cell]] for image in self.maps)
+                for cell in range(len(keys))
+            ]
+            for player, keys in zobrist.keys.items()
+        }
+        self.values = [0] * SYMMETRIES
+        for x, y in board.moves:
+            self.on_move(x, y, board.player_at(x, y))
+        board.add_listener(self)
+
+    def on_move(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi nước đi
+        """
+        self.values = list(map(xor, self.values, self.keys[player][x * self.size + y]))
+
+    def on_undo(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi lần hoàn tác
+        """
+        self.on_move(x, y, player)
+
+    def canonical(self):
+        """
+        Hash chính tắc của bàn cờ: nhỏ nhất trong 8 hash, nên mọi thế cờ đối
+        xứng với nhau có cùng hash.
+        Trả về (hash, t) với t là phép đối xứng đưa bàn cờ về dạng chính tắc
+        """
+        value = min(self.values)
+        return value, self.values.index(value)
+
+    def stabilizer(self):
+        """
+        Các phép đối xứng (khác đồng nhất) giữ nguyên bàn cờ hiện tại
+        """
+        return [t for t in range(1, SYMMETRIES) if self.values[t] == self.values[0]]
+
+    def unique_moves(self, moves):
+        """
+        Bỏ các nước đi đối xứng với một nước đi đứng trước trong moves qua
+        một phép đối xứng giữ nguyên bàn cờ (giữ nguyên thứ tự các nước còn lại)
+        """
+        stabilizer = self.stabilizer()
+        if not stabilizer:
+            return moves
+        size = self.size
+        seen = set()
+        result = []
+        for x, y in moves:
+            cell = x * size + y
+            if cell in seen:
+                continue
+            result.append((x, y))
+            seen.update(self.maps[t][cell] for t in stabilizer)
+        return result
@@ -0,0 +1,37 @@
+import random
+
+import pytest
+from bitboard import BitBoard
+from board import Board
+from problem import Problem
+
+
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+@pytest.mark.parametrize("win_length", [3, 4, 5])
+def test_incremental_matches_full_heuristic(board_class, win_length):
+    """
+    Sau mỗi nước đi và hoàn tác ngẫu nhiên, giá trị cập nhật dần phải bằng
+    giá trị tính lại toàn bộ bằng calculate_heuristic
+    """
+    rng = random.Random(win_length)
+    for game in range(20):
+        problem = Problem(
+            8, rng.choice("XO"), win_length=win_length, board_class=board_class
+        )
+        board = problem.board
+        player = "X"
+        for _ in range(60):
+            empty = [
+                (x, y)
+                for x in range(board.size)
+                for y in range(board.size)
+                if board.player_at(x, y) == board.empty
+            ]
+            if board.moves and (not empty or rng.random() < 0.3):
+                board.undo_move(*board.last_move)
+            else:
+                board.make_move(*rng.choice(empty), player)
+            player = "O" if player == "X" else "X"
+            assert problem.evaluate() == problem.calculate_heuristic(
+                board.board, problem.ai_player
+            )
@@ -0,0 +1,39 @@
+from itertools import product
+
+import regex
+from problem import UTILITY, generate_utility
+from scorer import PatternScorer
+
+
+def all_lines(max_length=8):
+    """
+    Mọi đường gồm các ký tự x/e/b có độ dài từ 1 đến max_length
+    """
+    for length in range(1, max_length + 1):
+        for chars in product(PatternScorer.ALPHABET, repeat=length):
+            yield "".join(chars)
+
+
+def check_scorer(utility):
+    """
+    So sánh số lần xuất hiện và điểm của PatternScorer với cách đếm bằng
+    regex (kể cả chồng lấn) trước đây
+    """
+    scorer = PatternScorer(utility)
+    compiled = [regex.compile(pattern) for _, _, pattern in scorer.patterns]
+    for line in all_lines():
+        expected = [len(p.findall(line, overlapped=True)) for p in compiled]
+        assert scorer.counts(line) == expected, line
+        score = sum(
+            value * count for (_, value, _), count in zip(scorer.patterns, expected)
+        )
+        assert scorer.score(line) == score, line
+
+
+def test_counts_match_regex():
+    check_scorer(UTILITY)
+
+
+def test_counts_match_regex_other_win_lengths():
+    for win_length in (3, 5):
+        check_scorer(generate_utility(win_length))
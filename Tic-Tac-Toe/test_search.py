@@ -0,0 +1,49 @@
+import pytest
+from benchmark import build_problem, load_positions
+from ordering import MoveOrdering
+from search import SearchStrategy
+
+POSITIONS = [position for position in load_positions() if position["size"] == 8]
+VARIANTS = [
+    dict(tt_size=None, ordering=False),
+    dict(tt_size=1 << 16, ordering=False),
+    dict(tt_size=None, ordering=True),
+    dict(tt_size=1 << 16, ordering=True),
+]
+
+
+def root_value(position, depth, algorithm="alphabeta", tt_size=None, ordering=False):
+    """
+    Giá trị của gốc sau khi tìm kiếm thế cờ mẫu với độ sâu cố định
+    """
+    strategy = SearchStrategy(
+        depth,
+        tt_size=tt_size,
+        ordering=MoveOrdering() if ordering else None,
+        algorithm=algorithm,
+    )
+    strategy.alpha_beta_search(build_problem(position))
+    return strategy.root_value
+
+
+@pytest.mark.parametrize("depth", [1, 2])
+@pytest.mark.parametrize("position", POSITIONS, ids=lambda p: p["name"])
+def test_pvs_matches_alphabeta(position, depth):
+    expected = root_value(position, depth)
+    for variant in VARIANTS:
+        assert root_value(position, depth, **variant) == expected, variant
+        assert root_value(position, depth, "pvs", **variant) == expected, variant
+
+
+@pytest.mark.parametrize("algorithm", ["alphabeta", "pvs"])
+@pytest.mark.parametrize("position", POSITIONS, ids=lambda p: p["name"])
+def test_aspiration_matches_full_window(position, algorithm):
+    expected = root_value(position, 2)
+    for window in (1, 1000):
+        problem = build_problem(position)
+        strategy = SearchStrategy(algorithm=algorithm, aspiration=window)
+        strategy.depth_limit = 1
+        move = strategy.search_root(problem)
+        strategy.depth_limit = 2
+        strategy.search_aspiration(problem, move)
+        assert strategy.root_value == expected, window
@@ -0,0 +1,157 @@
+from board import DIRECTIONS
+
+
+class ThreatSolver:
+    """
+    Tìm chuỗi nước đi ép buộc (threat-space search, VCF) trước khi tìm kiếm
+    Alpha-Beta. Chỉ xét nước đi tạo ra ô thắng cho bên tấn công (pattern
+    KillerMove "exxx"/"xxxe", hoặc hai ô thắng như ThreeInRow_OpenBothEnds
+    "exxxe"), bên phòng thủ buộc phải chặn đúng ô thắng đó.
+    """
+
+    def __init__(self, max_depth=10, max_nodes=20000):
+        """
+        max_depth: số nước tấn công tối đa của một chuỗi ép buộc
+        max_nodes: số trạng thái tối đa được xét cho mỗi lần tìm
+        """
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.time_up = None
+        self.timed_out = False
+
+    def solve(self, problem, time_up=None):
+        """
+        Tìm nước đi ép buộc cho AI. Trả về (move, kind) hoặc None:
+            "win": AI thắng ngay
+            "block": chặn ô thắng ngay của đối thủ
+            "vcf": nước đầu của chuỗi ép buộc dẫn tới chiến thắng
+            "defend": nước đi phá chuỗi ép buộc của đối thủ
+        time_up: hàm trả về True khi hết thời gian (None: không giới hạn).
+            Hết thời gian thì bỏ tìm chuỗi ép buộc và trả về None
+        """
+        self.time_up = time_up
+        self.timed_out = False
+        board = problem.board
+        ai, human = problem.ai_player, problem.human_player
+        if problem.is_game_over():
+            return None
+
+        wins = self.winning_cells(board, ai)
+        if wins:
+            return wins[0], "win"
+        threats = self.winning_cells(board, human)
+        if threats:
+            return threats[0], "block"
+
+        self.nodes = 0
+        sequence = self.vcf(board, ai, human, self.max_depth)
+        if sequence:
+            return sequence[0], "vcf"
+
+        self.nodes = 0
+        sequence = self.vcf(board, human, ai, self.max_depth)
+        if sequence:
+            # Thử chiếm các ô trong chuỗi ép buộc của đối thủ
+            for x, y in sequence:
+                board.make_move(x, y, ai)
+                self.nodes = 0
+                refuted = (
+                    not self.winning_cells(board, human)
+                    and self.vcf(board, human, ai, self.max_depth) is None
+                )
+                board.undo_move(x, y)
+                if self.timed_out:
+                    return None
+                if refuted:
+                    return (x, y), "defend"
+        return None
+
+    def line_cells(self, board, x, y):
+        """
+        Các ô trống trên 4 đường qua (x, y), cách (x, y) không quá
+        win_length - 1 ô
+        """
+        cells = []
+        reach = board.win_length - 1
+        for dx, dy in DIRECTIONS:
+            for step in range(-reach, reach + 1):
+                i, j = x + step * dx, y + step * dy
+                if (
+                    step != 0
+                    and 0 <= i < board.size
+                    and 0 <= j < board.size
+                    and board.player_at(i, j) == board.empty
+                ):
+                    cells.append((i, j))
+        return cells
+
+    def winning_cells(self, board, player, around=None):
+        """
+        Các ô mà player đặt quân vào là thắng ngay.
+        around: chỉ xét các ô trên đường qua ô này (None: quanh mọi quân
+        của player)
+        """
+        if around is not None:
+            cells = self.line_cells(board, *around)
+        else:
+            cells = set()
+            for x, y in board.moves:
+                if board.player_at(x, y) == player:
+                    cells.update(self.line_cells(board, x, y))
+            cells = sorted(cells)
+        result = []
+        for x, y in cells:
+            if (x, y) not in result and board.is_winning_cell(x, y, player):
+                result.append((x, y))
+        return result
+
+    def attacking_moves(self, board, attacker):
+        """
+        Các ô có thể tạo ra ô thắng cho attacker: ô trống gần quân của
+        attacker trên cùng một đường
+        """
+        cells = set()
+        for x, y in board.moves:
+            if board.player_at(x, y) == attacker:
+                cells.update(self.line_cells(board, x, y))
+        return sorted(cells)
+
+    def out_of_time(self):
+        """
+        Kiểm tra (và ghi nhớ) việc hết thời gian của lần tìm hiện tại
+        """
+        if not self.timed_out and self.time_up is not None and self.time_up():
+            self.timed_out = True
+        return self.timed_out
+
+    def vcf(self, board, attacker, defender, depth):
+        """
+        Tìm chuỗi ép buộc cho attacker (giả sử không bên nào có ô thắng ngay).
+        Trả về danh sách nước đi xen kẽ [tấn công, chặn, tấn công, ...] kết
+        thúc bằng nước tạo hai ô thắng, hoặc None
+        """
+        if depth == 0:
+            return None
+        for x, y in self.attacking_moves(board, attacker):
+            if self.nodes >= self.max_nodes or self.out_of_time():
+                return None
+            self.nodes += 1
+            board.make_move(x, y, attacker)
+            wins = self.winning_cells(board, attacker, around=(x, y))
+            sequence = None
+            if len(wins) >= 2:
+                sequence = [(x, y)]
+            elif len(wins) == 1:
+                block = wins[0]
+                board.make_move(*block, defender)
+                # Nước chặn không được tạo ô thắng cho bên phòng thủ
+                if not self.winning_cells(board, defender, around=block):
+                    rest = self.vcf(board, attacker, defender, depth - 1)
+                    if rest is not None:
+                        sequence = [(x, y), block] + rest
+                board.undo_move(*block)
+            board.undo_move(x, y)
+            if sequence is not None:
+                return sequence
+        return None
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+# Loại giá trị lưu trong bảng: chính xác, cận dưới (beta cutoff), cận trên
+EXACT, LOWER, UPPER = 0, 1, 2
+
+Entry = namedtuple("Entry", ["key", "depth", "value", "flag", "move"])
+
+
+def replace_always(old, new):
+    """
+    Luôn ghi đè mục cũ
+    """
+    return True
+
+
+def replace_by_depth(old, new):
+    """
+    Ghi đè nếu cùng trạng thái hoặc mục mới được tìm sâu hơn (hoặc bằng)
+    """
+    return old.key == new.key or new.depth >= old.depth
+
+
+REPLACEMENT_POLICIES = {
+    "always": replace_always,
+    "depth": replace_by_depth,
+}
+
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị có kích thước cố định, đánh chỉ số bằng hash Zobrist.
+    Mỗi ô lưu (key, depth, value, flag, move); khi hai trạng thái trùng ô,
+    chính sách thay thế quyết định giữ mục nào.
+    """
+
+    def __init__(self, size=1 << 18, replacement="depth"):
+        """
+        size: số ô của bảng
+        replacement: "always", "depth" hoặc hàm (old, new) -> bool
+        """
+        self.size = size
+        self.replace = (
+            REPLACEMENT_POLICIES[replacement]
+            if isinstance(replacement, str)
+            else replacement
+        )
+        self.entries = [None] * size
+
+    def lookup(self, key):
+        """
+        Tìm mục của trạng thái key, trả về None nếu không có
+        """
+        entry = self.entries[key % self.size]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        """
+        Lưu kết quả tìm kiếm của trạng thái key
+        """
+        index = key % self.size
+        new = Entry(key, depth, value, flag, move)
+        old = self.entries[index]
+        if old is None or self.replace(old, new):
+            self.entries[index] = new
+
+    def clear(self):
+        """
+        Xóa toàn bộ bảng
+        """
+        self.entries = [None] * self.size
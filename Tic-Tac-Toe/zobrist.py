@@ -0,0 +1,38 @@
+import numpy as np
+
+
+class ZobristHash:
+    """
+    Hash Zobrist của bàn cờ, cập nhật dần sau mỗi nước đi/hoàn tác bằng XOR.
+    Khóa ngẫu nhiên được sinh từ seed cố định nên giá trị hash giống nhau giữa
+    các lần chạy và giữa các tiến trình.
+    """
+
+    def __init__(self, board, players=("X", "O"), seed=2024):
+        """
+        Sinh khóa 64 bit cho mỗi (người chơi, ô) và khóa lượt đi
+        """
+        rng = np.random.default_rng(seed)
+        cells = board.size * board.size
+        self.size = board.size
+        self.keys = {
+            player: [int(k) for k in rng.integers(1, 2**63, cells, dtype=np.int64)]
+            for player in players
+        }
+        self.side_key = int(rng.integers(1, 2**63, dtype=np.int64))
+        self.value = 0
+        for x, y in board.moves:
+            self.value ^= self.keys[board.player_at(x, y)][x * self.size + y]
+        board.add_listener(self)
+
+    def on_move(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi nước đi
+        """
+        self.value ^= self.keys[player][x * self.size + y]
+
+    def on_undo(self, x, y, player):
+        """
+        Gọi bởi bàn cờ sau mỗi lần hoàn tác
+        """
+        self.value ^= self.keys[player][x * self.size + y]